@@ -0,0 +1,14 @@
+"""
+URL configuration used when serving over ASGI.
+
+The employee list, detail and field-management endpoints are answered by
+the async views in employees.async_views; everything else falls through
+to the regular URL configuration.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('api/', include('employees.async_urls')),
+] + wsgi_urlpatterns
@@ -30,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the middleware too.
+    'employees.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,7 +45,8 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt's JWTAuthentication without the per-request user query.
+        'accounts.authentication.ClaimsJWTAuthentication',
     ]
 }
 
@@ -61,7 +64,9 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('accounts.tokens.ClaimsAccessToken',),
+    # Tokens carry is_active/is_staff/username (see accounts/tokens.py).
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.ClaimsTokenObtainPairSerializer',
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
 }
@@ -74,6 +79,7 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True 
 
 
+# EmployeeCrud.settings_asgi (used by asgi.py) routes the employee API to the async views instead.
 ROOT_URLCONF = 'EmployeeCrud.urls'
 
 TEMPLATES = [
@@ -97,11 +103,35 @@ WSGI_APPLICATION = 'EmployeeCrud.wsgi.application'
 
 
 
+# employees.backends.sqlite3 applies WAL, synchronous, mmap, cache and
+# busy_timeout pragmas to every connection (override them with
+# OPTIONS['pragmas']). Connections are kept for CONN_MAX_AGE seconds.
+# 'readonly' opens query-only connections to the same file for the list
+# and detail reads.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'employees.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so a transaction that
+            # reads before it writes waits on busy_timeout instead of failing.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    'readonly': {
+        'ENGINE': 'employees.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'read_only': True,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
 
@@ -138,6 +168,63 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploaded files are served to authenticated users by employees.media.MediaView.
+# Behind nginx, set SENDFILE_BACKEND to 'x-accel' and map X_ACCEL_PREFIX to
+# MEDIA_ROOT in an "internal" location; 'x-sendfile' suits Apache and lighttpd.
+EMPLOYEES_MEDIA = {
+    'SENDFILE_BACKEND': None,
+    'X_ACCEL_PREFIX': '/protected-media/',
+}
+
+# Django's default handlers, plus a SHA-256 of each file computed while it is
+# received; employee uploads are stored under that hash (employees/uploads.py).
+FILE_UPLOAD_HANDLERS = [
+    'employees.uploads.HashingMemoryFileUploadHandler',
+    'employees.uploads.HashingTemporaryFileUploadHandler',
+]
+
+# Live user checks made by accounts.authentication.ClaimsJWTAuthentication.
+ACCOUNTS_TOKEN_AUTH = {
+    'LIVE_CHECK_TTL': 60,
+    'LIVE_CHECK_STAFF': True,
+}
+
+# Rendered employee list/search responses. BACKEND is 'lru' (per process) or
+# 'django' to use CACHES[CACHE_ALIAS], e.g. a locmem or file-based cache.
+EMPLOYEES_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'BACKEND': 'lru',
+    'MAX_ENTRIES': 256,
+}
+
+# Per-request SQL/timing instrumentation (employees/middleware.py): Server-Timing
+# headers, the "employees.slow_queries" log and /api/employees/request-stats/.
+EMPLOYEES_INSTRUMENTATION = {
+    'ENABLED': True,
+    'SLOW_QUERY_MS': 100,
+}
+
+# Change feed at /api/employees/changes/: tombstones older than this many seconds
+# are removed by the compact_change_feed command.
+EMPLOYEES_CHANGE_FEED = {
+    'TOMBSTONE_RETENTION': 7 * 24 * 3600,
+}
+
+# Group commit for employee creates, updates and deletes (employees/writes.py):
+# one writer thread commits concurrent writes together, waiting at most
+# MAX_DELAY_MS for more after the first. Measure with `manage.py bench_writes`.
+EMPLOYEES_GROUP_COMMIT = {
+    'ENABLED': False,
+    'MAX_BATCH': 64,
+    'MAX_DELAY_MS': 2,
+}
+
+# Thread pools behind the async employee views (employees/async_views.py).
+EMPLOYEES_ASYNC = {
+    'DB_THREADS': 8,
+    'IO_THREADS': 4,
+}
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
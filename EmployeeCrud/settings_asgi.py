@@ -0,0 +1,9 @@
+"""
+Settings used when serving EmployeeCrud over ASGI.
+
+Identical to EmployeeCrud.settings except that the employee API is routed
+to the async views (see EmployeeCrud/asgi_urls.py).
+"""
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'EmployeeCrud.asgi_urls'
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
-from django.conf.urls.static import static
+
+from employees.media import MediaView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,4 +11,6 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/', include('accounts.urls')), 
     path('api/', include('employees.urls')), 
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Uploaded files, for authenticated users only (see employees.media).
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", MediaView.as_view(), name='media'),
+]
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_CLAIMS
+
+DEFAULTS = {
+    # Seconds a live user lookup is reused; 0 looks the user up on every request that needs it.
+    'LIVE_CHECK_TTL': 60,
+    # Re-check tokens that claim is_staff against the database (through the TTL cache),
+    # so a revoked staff flag stops working within LIVE_CHECK_TTL instead of at token expiry.
+    'LIVE_CHECK_STAFF': True,
+    'MAX_CACHED_USERS': 10000,
+}
+
+UserState = namedtuple('UserState', ['is_active', 'is_staff', 'username'])
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, 'ACCOUNTS_TOKEN_AUTH', {})}
+
+
+class UserStateCache:
+    """Small TTL cache of the user fields authorization needs, keyed by user id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        """The user's live state (None when the user does not exist), from the cache when fresh."""
+        opts = options()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        row = (
+            get_user_model().objects
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list(*UserState._fields)
+            .first()
+        )
+        state = UserState(*row) if row is not None else None
+        if opts['LIVE_CHECK_TTL'] > 0:
+            with self._lock:
+                self._entries[user_id] = (now + opts['LIVE_CHECK_TTL'], state)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > opts['MAX_CACHED_USERS']:
+                    self._entries.popitem(last=False)
+        return state
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+user_states = UserStateCache()
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user built from the token claims (or a cached live lookup) instead of a User row."""
+
+    def __init__(self, token, state):
+        super().__init__(token)
+        self.state = state
+
+    @property
+    def is_active(self):
+        return self.state.is_active
+
+    @cached_property
+    def is_staff(self):
+        return self.state.is_staff
+
+    @cached_property
+    def username(self):
+        return self.state.username
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not load the user row on every request.
+
+    Tokens issued by accounts.tokens.ClaimsRefreshToken carry is_active,
+    is_staff and username, which are trusted until the token expires.
+    Tokens without those claims, and staff tokens when LIVE_CHECK_STAFF is
+    on, are checked against the database through a small TTL cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            state = UserState(*(validated_token[claim] for claim in USER_CLAIMS))
+            if state.is_staff and options()['LIVE_CHECK_STAFF']:
+                state = user_states.get(user_id)
+        else:
+            state = user_states.get(user_id)
+
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return ClaimsUser(validated_token, state)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_user_state(sender, instance, **kwargs):
+    user_states.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
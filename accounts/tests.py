@@ -1,3 +1,61 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .authentication import user_states
+from .models import User
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_states.invalidate()
+        self.user = User.objects.create_user(email='asha@example.com', username='asha', password='secret')
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/login/', {'username': 'asha', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        return response.data['access']
+
+    def get(self, url, token):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, url, token):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.get(url, token)
+        return response, [query['sql'] for query in captured if 'accounts_user' in query['sql']]
+
+    def test_login_token_authenticates_without_loading_the_user(self):
+        token = self.login()
+        response, queries = self.user_queries('/api/employees/', token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_token_endpoint_issues_claims(self):
+        response = self.client.post('/api/token/', {'username': 'asha', 'password': 'secret'})
+        response, queries = self.user_queries('/api/employees/', response.data['access'])
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    def test_tokens_without_claims_use_the_live_check_cache(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        response, queries = self.user_queries('/api/employees/', token)
+        self.assertEqual((response.status_code, len(queries)), (200, 1))
+        response, queries = self.user_queries('/api/employees/', token)
+        self.assertEqual((response.status_code, len(queries)), (200, 0))
+
+    def test_staff_claims_are_checked_live(self):
+        self.user.is_staff = True
+        self.user.save()
+        token = self.login()
+        self.assertEqual(self.get('/api/employees/cache-stats/', token).status_code, 200)
+        self.user.is_staff = False
+        self.user.save()  # drops the cached state straight away
+        self.assertEqual(self.get('/api/employees/cache-stats/', token).status_code, 403)
+
+    @override_settings(ACCOUNTS_TOKEN_AUTH={'LIVE_CHECK_TTL': 0})
+    def test_deactivated_users_are_rejected_on_live_check(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.get('/api/employees/', token).status_code, 401)
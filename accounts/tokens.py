@@ -0,0 +1,54 @@
+import base64
+
+from jwt import PyJWK
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+# User fields copied into every token so requests can be authorized without loading the user row.
+USER_CLAIMS = ('is_active', 'is_staff', 'username')
+
+
+class CachedKeyTokenBackend(TokenBackend):
+    """TokenBackend that builds the HMAC verification key once instead of on every decode."""
+
+    _prepared_key = None
+
+    def get_verifying_key(self, token):
+        if not self.algorithm.startswith('HS'):
+            return super().get_verifying_key(token)
+        if self._prepared_key is None:
+            key = self.signing_key.encode() if isinstance(self.signing_key, str) else self.signing_key
+            encoded = base64.urlsafe_b64encode(key).rstrip(b'=').decode()
+            self._prepared_key = PyJWK({'kty': 'oct', 'k': encoded}, algorithm=self.algorithm)
+        return self._prepared_key
+
+
+token_backend = CachedKeyTokenBackend(
+    api_settings.ALGORITHM,
+    api_settings.SIGNING_KEY,
+    api_settings.VERIFYING_KEY,
+    api_settings.AUDIENCE,
+    api_settings.ISSUER,
+    api_settings.JWK_URL,
+    api_settings.LEEWAY,
+    api_settings.JSON_ENCODER,
+)
+
+
+class ClaimsAccessToken(AccessToken):
+    _token_backend = token_backend
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying USER_CLAIMS; access tokens derived from it copy them."""
+
+    access_token_class = ClaimsAccessToken
+    _token_backend = token_backend
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
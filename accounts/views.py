@@ -2,7 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import SignupSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import ClaimsRefreshToken
 from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
 
@@ -22,7 +22,7 @@ class LoginView(APIView):
         user = authenticate(username=username, password=password)
         
         if user is not None:
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
             return Response({'access': access_token}, status=status.HTTP_200_OK)
         
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from .async_views import add_field_view, employee_detail_view, employee_view, export_view
+
+# Served ahead of employees.urls under ASGI (see EmployeeCrud/asgi_urls.py).
+urlpatterns = [
+    path('employees/', employee_view, name='employee'),
+    path('employees/add-field/', add_field_view, name='add-field'),
+    path('employees/search/', employee_view, name='employee-search'),
+    path('employees/export/', export_view, name='employee-export'),
+    path('employees/<int:pk>/', employee_detail_view, name='employee-detail'),
+    path('employees/edit-field/', add_field_view, name='edit-field'),
+]
@@ -0,0 +1,183 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .instrumentation import instrument_connections, timed_render
+from .schema import request_scope
+from .views import AddFieldView, EmployeeDetailView, EmployeeExportView, EmployeeView
+
+DEFAULTS = {
+    # Threads that run view bodies (and therefore SQLite queries). Each
+    # thread keeps its own database connection between requests.
+    'DB_THREADS': 8,
+    # Separate threads for requests carrying file uploads, so large writes
+    # to MEDIA_ROOT cannot starve ordinary reads of database threads.
+    'IO_THREADS': 4,
+    # Chunks buffered between a streaming query and the event loop.
+    'STREAM_BUFFER': 8,
+}
+
+
+class ExecutorPool:
+    """Lazily created, bounded thread pools shared by the async views."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executors = {}
+
+    @property
+    def options(self):
+        return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_ASYNC', {})}
+
+    def get(self, kind):
+        executor = self._executors.get(kind)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(kind)
+                if executor is None:
+                    workers = self.options['IO_THREADS' if kind == 'io' else 'DB_THREADS']
+                    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'employees-{kind}')
+                    self._executors[kind] = executor
+        return executor
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+
+
+pools = ExecutorPool()
+
+
+def _release_broken_connections():
+    # Connections are deliberately left open so the next request on this
+    # thread reuses them; only drop the ones a failed query left unusable.
+    for conn in connections.all(initialized_only=True):
+        if conn.errors_occurred:
+            conn.close_if_unusable_or_obsolete()
+
+
+def _call_in_pool(func, *args, **kwargs):
+    try:
+        with instrument_connections():
+            return func(*args, **kwargs)
+    finally:
+        _release_broken_connections()
+
+
+async def run_in_pool(kind, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (e.g. the request timer) onto the pool thread.
+    call = functools.partial(contextvars.copy_context().run, _call_in_pool, func, *args, **kwargs)
+    return await loop.run_in_executor(pools.get(kind), call)
+
+
+def _stream_in_pool(kind, iterator):
+    """
+    Drive a synchronous (cursor-backed) iterator on one pool thread and hand
+    its chunks to the event loop through a bounded queue.
+
+    The iterator must stay on a single thread because it owns that thread's
+    database cursor; the queue applies back-pressure so memory stays flat.
+    """
+    done = object()
+    owner = [iterator]
+    del iterator
+
+    async def generate():
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=pools.options['STREAM_BUFFER'])
+        cancelled = threading.Event()
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce():
+            # Taking the only reference means the generator (and its cursor)
+            # is finalized on this thread, even when the client disconnects.
+            chunks = owner.pop()
+            try:
+                for chunk in chunks:
+                    if cancelled.is_set():
+                        break
+                    put(chunk)
+            except Exception as e:
+                put(e)
+            finally:
+                del chunks
+                put(done)
+
+        producer = loop.run_in_executor(pools.get(kind), _call_in_pool, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            # Keep draining so a producer blocked on a full queue can finish.
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.001)
+            await producer
+
+    return generate()
+
+
+def async_view(view_class, **initkwargs):
+    """
+    Serve a DRF view from the event loop.
+
+    The view body runs unchanged on a dedicated, bounded thread pool instead
+    of asgiref's single thread-sensitive executor, so concurrent requests no
+    longer queue behind each other. Streaming responses are re-wrapped as
+    async iterators so ASGI does not have to buffer them.
+    """
+    sync_view = view_class.as_view(**initkwargs)
+
+    def render_view(request, *args, **kwargs):
+        response = sync_view(request, *args, **kwargs)
+        # Django would otherwise render DRF responses on asgiref's single
+        # thread-sensitive thread; rendering here leaves it a no-op.
+        if hasattr(response, 'render') and callable(response.render):
+            timed_render(response.render)()
+        return response
+
+    async def view(request, *args, **kwargs):
+        kind = 'io' if request.content_type == 'multipart/form-data' else 'db'
+        # request_started receivers run in a task of their own under ASGI, so the scope is opened here.
+        with request_scope():
+            response = await run_in_pool(kind, render_view, request, *args, **kwargs)
+        if isinstance(response, StreamingHttpResponse) and not response.is_async:
+            response.streaming_content = _stream_in_pool(kind, iter(response.streaming_content))
+        return response
+
+    view.view_class = view_class
+    view.view_initkwargs = initkwargs
+    return csrf_exempt(view)
+
+
+employee_view = async_view(EmployeeView)
+employee_detail_view = async_view(EmployeeDetailView)
+add_field_view = async_view(AddFieldView)
+export_view = async_view(EmployeeExportView)
+
+
+@receiver(setting_changed)
+def reset_pools(sender, setting, **kwargs):
+    if setting == 'EMPLOYEES_ASYNC':
+        pools.shutdown()
@@ -0,0 +1,48 @@
+"""
+SQLite backend with tuned connection pragmas and optional read-only connections.
+
+Configured through DATABASES[alias]['OPTIONS']:
+
+- ``pragmas``: overrides for DEFAULT_PRAGMAS; a value of None skips that pragma.
+- ``read_only``: open every connection with ``PRAGMA query_only`` so the
+  alias can serve reads only (see employees.routing).
+
+Everything else in OPTIONS is handled by Django's sqlite3 backend.
+"""
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    # Readers keep working while a writer commits; writers never wait for readers.
+    'journal_mode': 'WAL',
+    # Durable at each checkpoint instead of each commit, which is safe with WAL.
+    'synchronous': 'NORMAL',
+    # Wait for a competing writer instead of failing with "database is locked".
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB, so 64 MiB of page cache per connection.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Settings that belong to the database file and cannot be changed by a read-only connection.
+WRITER_ONLY_PRAGMAS = ('journal_mode',)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop('pragmas', {})}
+        self.read_only = kwargs.pop('read_only', False)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if value is None:
+                continue
+            if name in WRITER_ONLY_PRAGMAS and (self.read_only or self.is_in_memory_db()):
+                continue
+            conn.execute(f'PRAGMA {name} = {value}')
+        if self.read_only:
+            conn.execute('PRAGMA query_only = ON')
+        return conn
@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .signals import schema_changed
+
+DEFAULTS = {
+    'ENABLED': True,
+    # 'lru' keeps entries in this process; 'django' uses CACHES[CACHE_ALIAS]
+    # (for example a locmem or file-based cache shared by several workers).
+    'BACKEND': 'lru',
+    'MAX_ENTRIES': 256,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+BACKENDS = {
+    'lru': 'employees.cache.LRUBackend',
+    'django': 'employees.cache.DjangoCacheBackend',
+}
+
+
+class LRUBackend:
+    """Size-bounded in-process store; the least recently used entry is evicted first."""
+
+    def __init__(self, options):
+        self.max_entries = options['MAX_ENTRIES']
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class DjangoCacheBackend:
+    """
+    Store entries in one of Django's configured caches.
+
+    Size limits and eviction come from that cache's own OPTIONS (MAX_ENTRIES,
+    CULL_FREQUENCY). Clearing bumps a generation number that is part of every
+    key, so only this layer's entries are dropped from a shared cache.
+    """
+
+    generation_key = 'employees:response-cache:generation'
+
+    def __init__(self, options):
+        self.cache = caches[options['CACHE_ALIAS']]
+        self.timeout = options['TIMEOUT']
+
+    def _generation(self):
+        return self.cache.get_or_set(self.generation_key, 0, timeout=None)
+
+    def _key(self, key):
+        return f'employees:response-cache:{self._generation()}:{key}'
+
+    def get(self, key):
+        return self.cache.get(self._key(key))
+
+    def set(self, key, value):
+        self.cache.set(self._key(key), value, timeout=self.timeout)
+
+    def clear(self):
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            self.cache.set(self.generation_key, 1, timeout=None)
+
+    def size(self):
+        return None  # not known for shared caches
+
+
+class ResponseCache:
+    """
+    Cache of rendered employee list/search responses.
+
+    Keys are the response ETags, which already fold in the table version,
+    the schema version and the query parameters, so a stale body can never
+    be served. Write paths still call invalidate() so dead entries are
+    dropped straight away instead of waiting for eviction.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def options(self):
+        return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_RESPONSE_CACHE', {})}
+
+    @property
+    def enabled(self):
+        return self.options['ENABLED']
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            options = self.options
+            backend_path = BACKENDS.get(options['BACKEND'], options['BACKEND'])
+            self._backend = import_string(backend_path)(options)
+        return self._backend
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def invalidate(self):
+        if self._backend is None:
+            return
+        self._backend.clear()
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.options['BACKEND'],
+            'enabled': self.enabled,
+            'entries': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'invalidations': self.invalidations,
+        }
+
+    def reset(self):
+        """Forget the configured backend and the counters (used when settings change)."""
+        self._backend = None
+        self.hits = self.misses = self.invalidations = 0
+
+
+response_cache = ResponseCache()
+
+
+@receiver(schema_changed)
+def invalidate_on_schema_change(sender, **kwargs):
+    response_cache.invalidate()
+
+
+@receiver(setting_changed)
+def reload_cache_settings(sender, setting, **kwargs):
+    if setting in ('EMPLOYEES_RESPONSE_CACHE', 'CACHES'):
+        response_cache.reset()
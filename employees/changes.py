@@ -0,0 +1,244 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.dispatch import receiver
+
+from .projection import select_list
+from .routing import read_connection
+from .schema import TABLE_NAME, registry as schema_registry
+from .signals import schema_changed
+
+CHANGE_TABLE = 'employees_change'
+# One row: changes at or below this sequence number are no longer all in the log.
+HORIZON_TABLE = 'employees_change_horizon'
+
+DEFAULTS = {
+    # Seconds a tombstone is kept; clients that poll less often than this must resync.
+    'TOMBSTONE_RETENTION': 7 * 24 * 3600,
+}
+
+# Schema operations after which rows no longer have the columns clients hold.
+RESYNC_OPERATIONS = {'add', 'rename', 'drop', 'storage'}
+
+NOW_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+class ResyncRequired(Exception):
+    """The requested sequence number is older than the compacted part of the log."""
+
+    def __init__(self, horizon):
+        super().__init__(horizon)
+        self.horizon = horizon
+
+
+class ChangeFeed:
+    """
+    Log of employee changes for clients that keep a local copy.
+
+    Row triggers record every insert, update and delete as an upsert or a
+    tombstone under a fresh sequence number (AUTOINCREMENT, so numbers are
+    never reused). Each employee keeps only its latest entry: the log holds
+    one upsert per live row plus the tombstones, and a client that passes
+    the last sequence number it saw gets exactly the rows that changed
+    since. Old tombstones are compacted away; the horizon records how far,
+    and clients behind it have to start over from sequence 0.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_version = None
+
+    @property
+    def options(self):
+        return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_CHANGE_FEED', {})}
+
+    def expected_ddl(self):
+        qn = connection.ops.quote_name
+        table, log = qn(TABLE_NAME), qn(CHANGE_TABLE)
+
+        def record(row, operation):
+            return (
+                f"DELETE FROM {log} WHERE employee_id = {row}.id; "
+                f"INSERT INTO {log} (employee_id, operation, changed_at) VALUES ({row}.id, '{operation}', {NOW_SQL});"
+            )
+
+        # An update that changes the id deletes the old row as far as clients are concerned.
+        moved = (
+            f"DELETE FROM {log} WHERE employee_id = old.id AND old.id != new.id; "
+            f"INSERT INTO {log} (employee_id, operation, changed_at) "
+            f"SELECT old.id, 'delete', {NOW_SQL} WHERE old.id != new.id;"
+        )
+        bodies = {
+            'ai': record('new', 'upsert'),
+            'au': f"{record('new', 'upsert')} {moved}",
+            'ad': record('old', 'delete'),
+        }
+        ddl = {
+            CHANGE_TABLE: (
+                f"CREATE TABLE {log} (seq INTEGER PRIMARY KEY AUTOINCREMENT, employee_id INTEGER NOT NULL UNIQUE, "
+                f"operation TEXT NOT NULL, changed_at INTEGER NOT NULL)"
+            ),
+            HORIZON_TABLE: (
+                f"CREATE TABLE {qn(HORIZON_TABLE)} (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)"
+            ),
+        }
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            name = f'{CHANGE_TABLE}_{suffix}'
+            ddl[name] = f"CREATE TRIGGER {qn(name)} AFTER {event} ON {table} BEGIN {bodies[suffix]} END"
+        return ddl
+
+    def ensure(self):
+        if self._checked_version == schema_registry.version:
+            return
+        with self._lock:
+            expected = self.expected_ddl()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * len(expected)),
+                    list(expected),
+                )
+                installed = dict(cursor.fetchall())
+                if installed != expected:
+                    self._install(cursor, expected, installed)
+                    schema_registry.recheck()
+            self._checked_version = schema_registry.version
+
+    def _install(self, cursor, expected, installed):
+        """
+        Create what is missing and log every current row as an upsert.
+
+        Writes made while the triggers were missing went unrecorded, so the
+        horizon moves past the new entries: every client resyncs once.
+        """
+        qn = connection.ops.quote_name
+        log = qn(CHANGE_TABLE)
+        with transaction.atomic():
+            for name, sql in expected.items():
+                if installed.get(name) == sql or (name in (CHANGE_TABLE, HORIZON_TABLE) and name in installed):
+                    continue
+                if name in installed:
+                    cursor.execute(f"DROP TRIGGER {qn(name)}")
+                cursor.execute(sql)
+            cursor.execute(f"DELETE FROM {log} WHERE operation = 'upsert'")
+            cursor.execute(
+                f"INSERT INTO {log} (employee_id, operation, changed_at) "
+                f"SELECT id, 'upsert', {NOW_SQL} FROM {qn(TABLE_NAME)} ORDER BY id "
+                f"ON CONFLICT (employee_id) DO UPDATE SET operation = 'upsert'"
+            )
+            self._move_horizon(cursor)
+
+    def _move_horizon(self, cursor, seq=None):
+        """Set the horizon to ``seq``, never moving it back; by default past every sequence number given out."""
+        if seq is None:
+            # Use up one number, so a client that saw the newest entry is behind the horizon as well.
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [CHANGE_TABLE])
+            row = cursor.fetchone()
+            seq = (row[0] if row else 0) + 1
+            if row:
+                cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [seq, CHANGE_TABLE])
+            else:
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [CHANGE_TABLE, seq])
+        cursor.execute(
+            f"INSERT INTO {HORIZON_TABLE} (id, seq) VALUES (1, %s) "
+            f"ON CONFLICT (id) DO UPDATE SET seq = MAX(seq, excluded.seq)",
+            [seq],
+        )
+
+    def changes(self, since, limit, fields, after=None):
+        """
+        Changes after sequence number ``since``: upserted rows (limited to ``fields``) and deleted ids.
+
+        ``since=0`` starts from scratch: every live row is an upsert. When
+        ``has_more`` is set, the next page is read with the same ``since``
+        and ``after`` set to the returned ``after``; once a scan is complete,
+        ``next`` is the ``since`` of the following poll. Raises
+        ResyncRequired when changes after ``since`` have been compacted away.
+        """
+        for attempt in range(2):
+            self.ensure()
+            try:
+                return self._read(since, limit, fields, after)
+            except OperationalError:
+                if attempt:
+                    raise
+            # The tables disappeared behind our back (e.g. a rolled back transaction).
+            self.reset()
+
+    def _read(self, since, limit, fields, after):
+        start = max(since, after or 0)
+        with read_connection().cursor() as cursor:
+            cursor.execute(
+                f"SELECT log.seq, log.employee_id, log.operation, {select_list(fields)} "
+                f"FROM {CHANGE_TABLE} AS log LEFT JOIN {TABLE_NAME} ON {TABLE_NAME}.id = log.employee_id "
+                f"WHERE log.seq > %s ORDER BY log.seq LIMIT %s",
+                [start, limit + 1],
+            )
+            rows = cursor.fetchall()
+            # Read after the log: tombstones compacted before it was read show up as a later horizon.
+            cursor.execute(f"SELECT seq FROM {HORIZON_TABLE} WHERE id = 1")
+            horizon = cursor.fetchone()[0]
+        if 0 < since < horizon:
+            raise ResyncRequired(horizon)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        upserts, deletes = [], []
+        for _seq, employee_id, operation, *values in rows:
+            if operation == 'delete':
+                deletes.append(employee_id)
+            else:
+                upserts.append(dict(zip(fields, values)))
+        last = rows[-1][0] if rows else start
+        return {
+            'since': since,
+            # A scan from scratch has seen every live row, so it may continue past compacted tombstones.
+            'next': max(last, horizon) if since == 0 else last,
+            'after': last if has_more else None,
+            'has_more': has_more,
+            'horizon': horizon,
+            'columns': fields,
+            'upserts': upserts,
+            'deletes': deletes,
+        }
+
+    def _installed(self, cursor):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [HORIZON_TABLE])
+        return cursor.fetchone() is not None
+
+    def compact(self, retention=None):
+        """Drop tombstones older than ``retention`` seconds; returns how many were removed."""
+        if retention is None:
+            retention = self.options['TOMBSTONE_RETENTION']
+        cutoff = int(time.time()) - retention
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not self._installed(cursor):
+                return 0
+            cursor.execute(
+                f"SELECT COUNT(*), MAX(seq) FROM {CHANGE_TABLE} WHERE operation = 'delete' AND changed_at < %s",
+                [cutoff],
+            )
+            count, newest = cursor.fetchone()
+            if count:
+                cursor.execute(f"DELETE FROM {CHANGE_TABLE} WHERE operation = 'delete' AND seq <= %s", [newest])
+                self._move_horizon(cursor, newest)
+        return count
+
+    def expire(self):
+        """Make every client resync, e.g. after the columns of the table changed."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            if self._installed(cursor):
+                self._move_horizon(cursor)
+
+    def reset(self):
+        self._checked_version = None
+
+
+change_feed = ChangeFeed()
+
+
+@receiver(schema_changed)
+def expire_change_feed(sender, operation=None, **kwargs):
+    if operation in RESYNC_OPERATIONS:
+        change_feed.expire()
+    change_feed.reset()
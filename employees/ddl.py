@@ -0,0 +1,208 @@
+import re
+import sqlite3
+import time
+
+from django.db import OperationalError, connection, transaction
+
+# ALTER TABLE ... DROP COLUMN arrived in SQLite 3.35.0.
+NATIVE_DROP_COLUMN = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+REBUILD_CHUNK_SIZE = 5000
+
+
+def references_column(sql, column_name):
+    """Whether a CREATE INDEX/TRIGGER statement mentions ``column_name`` as an identifier."""
+    pattern = r'(?<![\w$])["`\[]?' + re.escape(column_name) + r'["`\]]?(?![\w$])'
+    return re.search(pattern, sql or '', re.IGNORECASE) is not None
+
+
+def dependent_objects(cursor, table, column_name):
+    """Indexes and triggers on ``table`` as (type, name, sql, depends_on_column), excluding autoindexes."""
+    cursor.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name = %s AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        [table],
+    )
+    return [(kind, name, sql, references_column(sql, column_name)) for kind, name, sql in cursor.fetchall()]
+
+
+def drop_column(table, column_name, progress=None, chunk_size=REBUILD_CHUNK_SIZE, online=False):
+    """
+    Remove ``column_name`` from ``table``.
+
+    When the SQLite library supports it the column is removed in place with
+    ALTER TABLE ... DROP COLUMN, after dropping the indexes and triggers
+    that use it. That is one transaction which rewrites the table, so
+    writers wait for all of it. Otherwise (when ``online`` is set, or when
+    the column is part of a UNIQUE/PRIMARY KEY constraint, which the native
+    command refuses) the table is rebuilt from DDL that keeps the remaining
+    column types, NOT NULL/DEFAULT clauses, UNIQUE constraints, indexes and
+    triggers. The rebuild commits after every chunk of ``chunk_size`` rows
+    and only swaps the tables in a short final transaction (see
+    _rebuild_without). ``progress`` is called with the fraction of rows
+    copied so far.
+    """
+    progress = progress or (lambda fraction: None)
+    qn = connection.ops.quote_name
+    started = time.perf_counter()
+    strategy, rows = None, None
+    if NATIVE_DROP_COLUMN and not online:
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for kind, name, _sql, depends in dependent_objects(cursor, table, column_name):
+                    if depends:
+                        cursor.execute(f"DROP {kind.upper()} {qn(name)}")
+                cursor.execute(f"ALTER TABLE {qn(table)} DROP COLUMN {qn(column_name)}")
+            strategy = 'native'
+        except OperationalError:
+            strategy = None
+    if strategy is None:
+        rows = _rebuild_without(table, column_name, progress, chunk_size)
+        strategy = 'rebuild'
+    progress(1.0)
+    return {
+        'strategy': strategy,
+        # Only known for rebuilds; counting the rows would be a full scan on the native path.
+        'rows': rows,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _table_definition(cursor, table, column_name):
+    """CREATE TABLE body for ``table`` without ``column_name``; returns (definition, kept column names)."""
+    qn = connection.ops.quote_name
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+    autoincrement = 'AUTOINCREMENT' in cursor.fetchone()[0].upper()
+
+    cursor.execute(f"PRAGMA table_info({qn(table)})")
+    columns = [row for row in cursor.fetchall() if row[1] != column_name]
+    pk_columns = [row for row in columns if row[5]]
+    definitions = []
+    for _cid, name, sql_type, notnull, default, pk in columns:
+        parts = [qn(name)]
+        if sql_type:
+            parts.append(sql_type)
+        if notnull:
+            parts.append('NOT NULL')
+        if pk and len(pk_columns) == 1:
+            parts.append('PRIMARY KEY AUTOINCREMENT' if autoincrement else 'PRIMARY KEY')
+        if default is not None:
+            parts.append(f'DEFAULT {default}')
+        definitions.append(' '.join(parts))
+    if len(pk_columns) > 1:
+        ordered = sorted(pk_columns, key=lambda row: row[5])
+        definitions.append(f"PRIMARY KEY ({', '.join(qn(row[1]) for row in ordered)})")
+
+    cursor.execute(f"PRAGMA index_list({qn(table)})")
+    for _seq, index_name, unique, origin, _partial in cursor.fetchall():
+        if origin != 'u':
+            continue
+        cursor.execute(f"PRAGMA index_info({qn(index_name)})")
+        index_columns = [row[2] for row in cursor.fetchall()]
+        if column_name not in index_columns:
+            definitions.append(f"UNIQUE ({', '.join(qn(name) for name in index_columns)})")
+
+    cursor.execute(f"PRAGMA foreign_key_list({qn(table)})")
+    foreign_keys = {}
+    for fk_id, _seq, ref_table, from_column, to_column, on_update, on_delete, _match in cursor.fetchall():
+        foreign_keys.setdefault(fk_id, [ref_table, [], [], on_update, on_delete])
+        foreign_keys[fk_id][1].append(from_column)
+        foreign_keys[fk_id][2].append(to_column)
+    for ref_table, from_columns, to_columns, on_update, on_delete in foreign_keys.values():
+        if column_name in from_columns:
+            continue
+        definitions.append(
+            f"FOREIGN KEY ({', '.join(qn(c) for c in from_columns)}) REFERENCES {qn(ref_table)} "
+            f"({', '.join(qn(c) for c in to_columns)}) ON UPDATE {on_update} ON DELETE {on_delete}"
+        )
+    return ', '.join(definitions), [row[1] for row in columns]
+
+
+def _rebuild_without(table, column_name, progress, chunk_size):
+    """
+    Copy ``table`` without ``column_name`` into a new table, then swap the two.
+
+    Each chunk is copied in its own transaction, so API writes only wait
+    for one chunk at a time. Triggers on the old table mirror the writes
+    made meanwhile into the new one; the copy uses INSERT OR REPLACE, so a
+    row the triggers already brought over is simply written again. The
+    final transaction drops the old table, renames the new one and
+    recreates the indexes and triggers that do not use the column.
+    """
+    qn = connection.ops.quote_name
+    temp_table = f'{table}__rebuild'
+    mirrors = [f'{temp_table}_{suffix}' for suffix in ('ai', 'au', 'ad')]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        definition, kept_columns = _table_definition(cursor, table, column_name)
+        column_list = ', '.join(qn(name) for name in kept_columns)
+        new_values = ', '.join(f'NEW.{qn(name)}' for name in kept_columns)
+        upsert = f"INSERT OR REPLACE INTO {qn(temp_table)} ({column_list}) VALUES ({new_values});"
+        delete = f"DELETE FROM {qn(temp_table)} WHERE rowid = OLD.rowid;"
+        _drop_rebuild(cursor, temp_table, mirrors)
+        cursor.execute(f"CREATE TABLE {qn(temp_table)} ({definition})")
+        for name, event, body in zip(mirrors, ('INSERT', 'UPDATE', 'DELETE'), (upsert, delete + upsert, delete)):
+            cursor.execute(f"CREATE TRIGGER {qn(name)} AFTER {event} ON {qn(table)} BEGIN {body} END")
+        cursor.execute(f"SELECT COUNT(*) FROM {qn(table)}")
+        total = cursor.fetchone()[0]
+
+    try:
+        # The rowid alias (id) is always kept; chunks are bounded by the old table's rowids,
+        # as the mirror triggers may already have put later rows into the new one.
+        copy_sql = f"INSERT OR REPLACE INTO {qn(temp_table)} ({column_list}) SELECT {column_list} FROM {qn(table)}"
+        copied, last_rowid = 0, None
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if last_rowid is None:
+                    after, params = '', []
+                else:
+                    after, params = 'rowid > %s AND', [last_rowid]
+                cursor.execute(
+                    f"SELECT MAX(rowid) FROM (SELECT rowid FROM {qn(table)} "
+                    f"{'WHERE rowid > %s' if params else ''} ORDER BY rowid LIMIT %s)",
+                    params + [chunk_size],
+                )
+                upto = cursor.fetchone()[0]
+                if upto is None:
+                    break
+                cursor.execute(f"{copy_sql} WHERE {after} rowid <= %s", params + [upto])
+                copied += cursor.rowcount
+            last_rowid = upto
+            progress(min(copied / total, 0.99) if total else 0.99)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for name in mirrors:
+                cursor.execute(f"DROP TRIGGER {qn(name)}")
+            kept_objects = [
+                (kind, name, sql) for kind, name, sql, depends in dependent_objects(cursor, table, column_name)
+                if not depends
+            ]
+            sequence = None
+            if _has_sequence(cursor):
+                cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+                sequence = cursor.fetchone()
+            cursor.execute(f"DROP TABLE {qn(table)}")
+            cursor.execute(f"ALTER TABLE {qn(temp_table)} RENAME TO {qn(table)}")
+            if sequence:
+                cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s", [sequence[0], table])
+            for _kind, _name, sql in kept_objects:
+                cursor.execute(sql)
+    except Exception:
+        if not connection.needs_rollback:
+            with transaction.atomic(), connection.cursor() as cursor:
+                _drop_rebuild(cursor, temp_table, mirrors)
+        raise
+    return copied
+
+
+def _drop_rebuild(cursor, temp_table, mirrors):
+    """Remove what an interrupted rebuild left behind."""
+    qn = connection.ops.quote_name
+    for name in mirrors:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(name)}")
+    cursor.execute(f"DROP TABLE IF EXISTS {qn(temp_table)}")
+
+
+def _has_sequence(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'")
+    return cursor.fetchone() is not None
@@ -0,0 +1,163 @@
+import json
+from collections import namedtuple
+from datetime import date
+
+from .schema import TABLE_NAME, registry as schema_registry
+
+# Query parameters of the list endpoint that are never read as filters.
+RESERVED_PARAMS = {'search', 'limit', 'after', 'fields', 'stream', 'format'}
+
+COMPARISONS = {'eq': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+LOOKUPS = (*COMPARISONS, 'range', 'in', 'prefix', 'null')
+
+# Logical types stored with TEXT affinity (or none), where a prefix can be matched as a string range.
+PREFIX_TYPES = {'char', 'text', 'email', 'phone', 'url', 'file.txt', 'image'}
+
+Filter = namedtuple('Filter', ['field', 'lookup', 'value'])
+
+# JSON values that can be bound as a single SQL parameter.
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def check_scalars(values):
+    """Raise ValueError naming the first field of {field: value} whose value is an object or an array."""
+    for name, value in values.items():
+        if not isinstance(value, SCALAR_TYPES):
+            raise ValueError(f"Field '{name}' must be a string, number, boolean or null")
+
+
+def ids_clause(ids):
+    """Match a list of employee ids with a single bound parameter, however long the list."""
+    if not isinstance(ids, list) or not ids or not all(type(pk) is int for pk in ids):
+        raise ValueError("ids must be a non-empty list of integers")
+    return ["id IN (SELECT value FROM json_each(%s))"], [json.dumps(ids)]
+
+
+def equality_clause(filters):
+    """Turn {column: value} into AND-ed equality predicates; None matches NULL."""
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError("filter must be a non-empty object")
+    columns = set(schema_registry.names())
+    unknown = [name for name in filters if name not in columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    check_scalars(filters)
+    where, params = [], []
+    for (name, value), column in zip(filters.items(), schema_registry.expressions(list(filters))):
+        if value is None:
+            where.append(f"{column} IS NULL")
+        else:
+            where.append(f"{column} = %s")
+            params.append(value)
+    return where, params
+
+
+def selection_clause(data):
+    """Rows chosen by a bulk request body: either ``ids`` or ``filter``, never both."""
+    if ('ids' in data) == ('filter' in data):
+        raise ValueError("Provide either 'ids' or 'filter'")
+    if 'ids' in data:
+        return ids_clause(data['ids'])
+    return equality_clause(data['filter'])
+
+
+def parse_bool(value):
+    lowered = str(value).lower()
+    if lowered in ('1', 'true', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"expected true or false, got '{value}'")
+
+
+def coerce(column, value):
+    """Convert a query string value to what ``column`` stores, based on its logical type."""
+    try:
+        if column.field_type == 'number':
+            return int(value)
+        if column.field_type == 'date':
+            return date.fromisoformat(value).isoformat()
+        if column.field_type == 'checkbox':
+            return int(parse_bool(value))
+    except ValueError:
+        raise ValueError(f"Invalid value for '{column.name}': expected a {column.field_type}, got '{value}'")
+    return value
+
+
+def _parse_filter(column, lookup, raw):
+    if lookup == 'null':
+        try:
+            return Filter(column.name, lookup, parse_bool(raw))
+        except ValueError as e:
+            raise ValueError(f"Invalid value for '{column.name}__null': {e}")
+    if lookup == 'in':
+        values = [coerce(column, value) for value in raw.split(',') if value != '']
+        if not values:
+            raise ValueError(f"'{column.name}__in' needs at least one value")
+        return Filter(column.name, lookup, values)
+    if lookup == 'range':
+        bounds = raw.split(',')
+        if len(bounds) != 2:
+            raise ValueError(f"'{column.name}__range' takes two comma separated values")
+        return Filter(column.name, lookup, [coerce(column, bound) for bound in bounds])
+    if lookup == 'prefix':
+        if column.field_type not in PREFIX_TYPES:
+            raise ValueError(f"'{column.name}__prefix' needs a text field")
+        if not raw:
+            raise ValueError(f"'{column.name}__prefix' needs a value")
+        return Filter(column.name, lookup, raw)
+    return Filter(column.name, lookup, coerce(column, raw))
+
+
+def parse_filters(query_params):
+    """
+    Typed filters from list query parameters such as ``joined__range=2024-01-01,2024-06-30``.
+
+    ``<field>=value`` is an equality test and ``<field>__<lookup>=value`` uses
+    one of LOOKUPS. Values are coerced to the column's logical type; bad
+    lookups, unknown fields in a lookup and bad values raise ValueError.
+    Other unrecognised parameters are ignored.
+    """
+    filters = []
+    for key, values in query_params.lists():
+        if key in RESERVED_PARAMS:
+            continue
+        field_name, separator, lookup = key.rpartition('__')
+        if not separator or schema_registry.get(key) is not None:
+            field_name, lookup = key, 'eq'
+            if schema_registry.get(field_name) is None:
+                continue
+        elif lookup not in LOOKUPS:
+            raise ValueError(f"Unknown lookup '{lookup}'; use one of: {', '.join(LOOKUPS)}")
+        column = schema_registry.get(field_name)
+        if column is None:
+            raise ValueError(f"Unknown field: {field_name}")
+        filters.extend(_parse_filter(column, lookup, raw) for raw in values)
+    return filters
+
+
+def filter_clause(filters, table=TABLE_NAME):
+    """
+    AND-ed predicates for parsed filters, written so SQLite can answer them from an index.
+
+    Prefixes become a half-open string range rather than LIKE, which only
+    uses an index with case-insensitive collations.
+    """
+    where, params = [], []
+    expressions = schema_registry.expressions([item.field for item in filters], table) if filters else []
+    for (field, lookup, value), column in zip(filters, expressions):
+        if lookup in COMPARISONS:
+            where.append(f"{column} {COMPARISONS[lookup]} %s")
+            params.append(value)
+        elif lookup == 'range':
+            where.append(f"{column} BETWEEN %s AND %s")
+            params.extend(value)
+        elif lookup == 'in':
+            where.append(f"{column} IN (SELECT value FROM json_each(%s))")
+            params.append(json.dumps(value))
+        elif lookup == 'prefix':
+            where.append(f"{column} >= %s AND {column} < %s")
+            params.extend([value, value[:-1] + chr(ord(value[-1]) + 1)])
+        elif lookup == 'null':
+            where.append(f"{column} IS NULL" if value else f"{column} IS NOT NULL")
+    return where, params
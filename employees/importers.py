@@ -0,0 +1,173 @@
+import codecs
+import csv
+import json
+from contextlib import nullcontext
+
+from django.db import DatabaseError, connection, transaction
+
+from .filters import check_scalars
+from .schema import registry as schema_registry
+from .storage import insert_statement
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole cannot be imported (bad header, unknown format, ...)."""
+
+
+def iter_lines(stream):
+    """Decode a binary upload or request body line by line without reading it all."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    while True:
+        line = stream.readline(65536)
+        if not line:
+            break
+        yield decoder.decode(line)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def read_csv(lines):
+    """Yield (line number, row dict) pairs; the header is checked by the importer."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        raise ImportFormatError("The CSV file is empty")
+    header = [column.strip() for column in header]
+    yield 1, header
+    for row in reader:
+        if not any(row):
+            continue
+        if len(row) != len(header):
+            yield reader.line_num, ValueError(f"Expected {len(header)} values, got {len(row)}")
+            continue
+        yield reader.line_num, dict(zip(header, row))
+
+
+def read_ndjson(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError("Each line must be a JSON object")
+            continue
+        yield line_number, record
+
+
+class BulkImporter:
+    """
+    Insert a stream of employee rows in batches.
+
+    Column names are checked against a single snapshot of the live schema.
+    Each batch is written with executemany and committed as its own
+    transaction; when a batch fails, its rows are retried one by one in
+    savepoints so that only the offending rows are reported and skipped.
+    A dry run executes every batch inside one outer transaction that is
+    rolled back at the end, so uniqueness problems are still reported.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        columns = schema_registry.columns()
+        self.insertable = {column.name for column in columns if not column.pk}
+        self.required = {
+            column.name for column in columns if column.notnull and not column.pk and column.default is None
+        }
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def report(self):
+        return {
+            'processed': self.processed,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'dry_run': self.dry_run,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def run(self, records, import_format):
+        """Consume (line number, row or error) pairs produced by read_csv/read_ndjson."""
+        records = iter(records)
+        if import_format == 'csv':
+            _line, header = next(records)
+            unknown = [column for column in header if column not in self.insertable]
+            if unknown:
+                raise ImportFormatError(f"Unknown columns: {', '.join(unknown)}")
+
+        with transaction.atomic() if self.dry_run else nullcontext():
+            batch = []
+            for line_number, record in records:
+                self.processed += 1
+                row = record if isinstance(record, Exception) else self.clean(record)
+                if isinstance(row, Exception):
+                    self.fail(line_number, row)
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+            if self.dry_run:
+                transaction.set_rollback(True)
+        return self.report()
+
+    def clean(self, record):
+        row = {key: value for key, value in record.items() if value not in (None, '')}
+        unknown = [key for key in row if key not in self.insertable]
+        if unknown:
+            return ValueError(f"Unknown columns: {', '.join(unknown)}")
+        try:
+            check_scalars(row)
+        except ValueError as e:
+            return e
+        missing = sorted(self.required.difference(row))
+        if missing:
+            return ValueError(f"Missing required values: {', '.join(missing)}")
+        return row
+
+    def fail(self, line_number, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': str(error)})
+
+    def flush(self, batch):
+        # Rows with the same keys share one prepared INSERT.
+        groups = {}
+        for line_number, row in batch:
+            groups.setdefault(tuple(sorted(row)), []).append((line_number, row))
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for columns, rows in groups.items():
+                    statement = insert_statement(columns)
+                    cursor.executemany(statement.sql, [statement.params(row) for _line, row in rows])
+            self.inserted += len(batch)
+        except DatabaseError:
+            self.retry_rows(groups)
+
+    def retry_rows(self, groups):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for columns, rows in groups.items():
+                statement = insert_statement(columns)
+                for line_number, row in rows:
+                    try:
+                        with transaction.atomic():
+                            cursor.execute(statement.sql, statement.params(row))
+                        self.inserted += 1
+                    except DatabaseError as db_error:
+                        self.fail(line_number, db_error)
@@ -0,0 +1,124 @@
+import re
+
+from django.db import connection, transaction
+
+from .instrumentation import explain
+from .routing import read_connection
+from .schema import TABLE_NAME, registry as schema_registry
+from .storage import model_columns, promote
+
+# Indexes created through the API; anything else (migrations, UNIQUE constraints) is left alone.
+MANAGED_PREFIX = f'{TABLE_NAME}_idx_'
+
+# "SEARCH employees_employee USING INDEX name (dept=? AND joined>?)" and the rowid form of it.
+SEARCH_STEP = re.compile(
+    r'^SEARCH (?P<table>\S+)(?: AS \S+)? USING (?:COVERING INDEX (?P<covering>\S+)|INDEX (?P<index>\S+)'
+    r'|(?P<rowid>INTEGER PRIMARY KEY)) \((?P<terms>[^)]*)\)'
+)
+SEARCH_TERM = re.compile(r'(\w+)\s*(?:=|>|<|IS\b)')
+
+
+def index_name(fields):
+    """Managed index name for ``fields``; field names cannot contain '-', so no two field lists share a name."""
+    return MANAGED_PREFIX + '-'.join(fields)
+
+
+def describe(index):
+    return {
+        'name': index.name,
+        'fields': list(index.columns),
+        'unique': index.unique,
+        'partial': index.partial,
+        'managed': index.name.startswith(MANAGED_PREFIX),
+    }
+
+
+def find_index(fields):
+    """The existing index over exactly ``fields`` (in order), or None."""
+    for index in schema_registry.indexes():
+        if list(index.columns) == list(fields) and not index.partial:
+            return index
+    return None
+
+
+def validate_index_fields(fields):
+    """Check that ``fields`` are distinct dynamic columns; raises ValueError."""
+    if not isinstance(fields, list) or not fields or not all(isinstance(name, str) and name for name in fields):
+        raise ValueError("fields must be a non-empty list of field names")
+    if len(set(fields)) != len(fields):
+        raise ValueError("fields must not repeat")
+    unknown = [name for name in fields if schema_registry.get(name) is None]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    fixed = [name for name in fields if name in model_columns()]
+    if fixed:
+        raise ValueError(f"Only dynamic fields can be indexed here: {', '.join(fixed)}")
+
+
+def create_index(fields, unique=False):
+    """
+    CREATE INDEX over dynamic ``fields``; the caller has validated them.
+
+    JSON fields are promoted to generated columns first, in the same transaction.
+    """
+    qn = connection.ops.quote_name
+    name = index_name(fields)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for field in fields:
+            promote(field)
+        cursor.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {qn(name)} "
+            f"ON {qn(TABLE_NAME)} ({', '.join(qn(field) for field in fields)})"
+        )
+    return name
+
+
+def drop_index(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+
+def index_usage(plan):
+    """Map each employee column constrained by an index seek in ``plan`` to the index used."""
+    usage = {}
+    for step in plan or ():
+        match = SEARCH_STEP.match(step)
+        if match is None or match['table'] != TABLE_NAME:
+            continue
+        used = 'PRIMARY KEY' if match['rowid'] else match['covering'] or match['index']
+        for column in SEARCH_TERM.findall(match['terms']):
+            usage.setdefault('id' if column == 'rowid' else column, used)
+    return usage
+
+
+def plan_report(query, params, filters):
+    """
+    EXPLAIN QUERY PLAN for a list query, with each filter marked as index-backed or not.
+
+    A filter is index-backed when SQLite seeks on its column. For the
+    others, ``candidate_index`` names an index that starts with the column
+    (which the planner chose not to use), and ``full_scan`` says whether the
+    employee table is read from start to end.
+    """
+    plan = explain(read_connection(), query, params) or []
+    usage = index_usage(plan)
+    leading = {}
+    for index in schema_registry.indexes():
+        if index.columns and not index.partial:
+            leading.setdefault(index.columns[0], index.name)
+    return {
+        'sql': query,
+        'params': params,
+        'plan': plan,
+        'full_scan': any(re.match(rf'^SCAN {TABLE_NAME}\b', step) for step in plan),
+        'filters': [
+            {
+                'field': item.field,
+                'lookup': item.lookup,
+                'index_backed': item.field in usage,
+                'index': usage.get(item.field),
+                'candidate_index': None if item.field in usage else leading.get(item.field),
+            }
+            for item in filters
+        ],
+    }
@@ -0,0 +1,214 @@
+import bisect
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+slow_query_logger = logging.getLogger('employees.slow_queries')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    # Statements slower than this are logged to "employees.slow_queries"; None disables the log.
+    'SLOW_QUERY_MS': 100,
+    'EXPLAIN_SLOW_QUERIES': True,
+    # Upper bounds (ms) of the request duration histogram buckets; slower requests land in "+Inf".
+    'HISTOGRAM_BUCKETS_MS': [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+}
+
+MAX_LOGGED_PARAMS_LENGTH = 500
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_INSTRUMENTATION', {})}
+
+
+class RequestTimer:
+    """SQL and render time of one request; set as the current timer while the request runs."""
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.options = options()
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+
+    def add_render(self, seconds):
+        with self._lock:
+            self.render_seconds += seconds
+
+    def summary(self):
+        total = time.perf_counter() - self.started
+        db, render = self.db_seconds, self.render_seconds
+        return {
+            'total_ms': total * 1000,
+            'db_ms': db * 1000,
+            'render_ms': render * 1000,
+            'app_ms': max(total - db - render, 0.0) * 1000,
+            'queries': self.queries,
+        }
+
+
+current_timer = ContextVar('employees_request_timer', default=None)
+
+_explaining = threading.local()
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that times each statement for the current request and logs slow ones."""
+    timer = current_timer.get()
+    if timer is None or getattr(_explaining, 'active', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        timer.add_query(elapsed)
+        threshold = timer.options['SLOW_QUERY_MS']
+        if threshold is not None and elapsed * 1000 >= threshold:
+            log_slow_query(timer, context['connection'], sql, params, many, elapsed)
+
+
+def explain(connection, sql, params):
+    """EXPLAIN QUERY PLAN rows as their detail strings, or None when the plan cannot be produced."""
+    _explaining.active = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.active = False
+
+
+def log_slow_query(timer, connection, sql, params, many, elapsed):
+    plan = None
+    if timer.options['EXPLAIN_SLOW_QUERIES'] and not many:
+        plan = explain(connection, sql, params)
+    record = {
+        'endpoint': timer.endpoint,
+        'alias': connection.alias,
+        'duration_ms': round(elapsed * 1000, 3),
+        'sql': sql,
+        'params': repr(params)[:MAX_LOGGED_PARAMS_LENGTH],
+        'many': many,
+        'plan': plan,
+    }
+    slow_query_logger.warning(json.dumps(record), extra={'slow_query': record})
+
+
+def timed_render(render):
+    """Wrap a response's render method so the time it takes counts as serialization."""
+    @functools.wraps(render)
+    def wrapper():
+        timer = current_timer.get()
+        started = time.perf_counter()
+        try:
+            return render()
+        finally:
+            if timer is not None:
+                timer.add_render(time.perf_counter() - started)
+    return wrapper
+
+
+def server_timing(summary):
+    return ', '.join([
+        f'db;dur={summary["db_ms"]:.2f};desc="{summary["queries"]} queries"',
+        f'render;dur={summary["render_ms"]:.2f}',
+        f'app;dur={summary["app_ms"]:.2f}',
+        f'total;dur={summary["total_ms"]:.2f}',
+    ])
+
+
+class EndpointStats:
+    """Per-endpoint request counts, duration histograms and DB totals for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, summary, buckets):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None or stats['buckets'] != buckets:
+                stats = self._endpoints[endpoint] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * (len(buckets) + 1),
+                    'requests': 0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'total_ms': 0.0,
+                    'db_ms': 0.0,
+                    'render_ms': 0.0,
+                }
+            stats['counts'][bisect.bisect_left(buckets, summary['total_ms'])] += 1
+            stats['requests'] += 1
+            stats['queries'] += summary['queries']
+            stats['max_queries'] = max(stats['max_queries'], summary['queries'])
+            for key in ('total_ms', 'db_ms', 'render_ms'):
+                stats[key] += summary[key]
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: self._describe(stats) for endpoint, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    @staticmethod
+    def _describe(stats):
+        requests = stats['requests']
+        labels = [str(bound) for bound in stats['buckets']] + ['+Inf']
+        return {
+            'requests': requests,
+            'histogram_ms': dict(zip(labels, stats['counts'])),
+            'p50_ms': EndpointStats._quantile(stats, 0.5),
+            'p95_ms': EndpointStats._quantile(stats, 0.95),
+            'p99_ms': EndpointStats._quantile(stats, 0.99),
+            'mean_ms': round(stats['total_ms'] / requests, 3),
+            'mean_db_ms': round(stats['db_ms'] / requests, 3),
+            'mean_render_ms': round(stats['render_ms'] / requests, 3),
+            'mean_queries': round(stats['queries'] / requests, 2),
+            'max_queries': stats['max_queries'],
+        }
+
+    @staticmethod
+    def _quantile(stats, fraction):
+        """Upper bound of the bucket holding the given quantile (None when it is the overflow bucket)."""
+        target = fraction * stats['requests']
+        seen = 0
+        for bound, count in zip(stats['buckets'] + [None], stats['counts']):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+
+endpoint_stats = EndpointStats()
+
+
+@contextmanager
+def instrument_connections():
+    """Install record_query on this thread's connection for every database alias."""
+    with ExitStack() as stack:
+        for alias in connections:
+            connection = connections[alias]
+            if record_query not in connection.execute_wrappers:
+                stack.enter_context(connection.execute_wrapper(record_query))
+        yield
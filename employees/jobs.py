@@ -0,0 +1,93 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.db import connection
+
+MAX_FINISHED_JOBS = 100
+
+
+class JobConflict(Exception):
+    """Another schema job is still running."""
+
+
+class SchemaJob:
+    def __init__(self, operation, field_name):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.field_name = field_name
+        self.status = 'pending'
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def set_progress(self, fraction):
+        self.progress = round(fraction, 4)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'operation': self.operation,
+            'field_name': self.field_name,
+            'status': self.status,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class SchemaJobRunner:
+    """
+    Runs schema changes on a background thread, one at a time, so a large
+    rebuild does not hold an API worker for its whole duration.
+
+    Job state lives in this process only; clients must poll the worker that
+    accepted the job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._running = None
+
+    def submit(self, operation, field_name, func):
+        """Start ``func(progress_callback)`` in the background and return its job."""
+        job = SchemaJob(operation, field_name)
+        with self._lock:
+            if self._running is not None:
+                raise JobConflict(self._running.id)
+            self._running = job
+            self._jobs[job.id] = job
+            finished = [key for key, other in self._jobs.items() if other.finished_at]
+            for key in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[key]
+        threading.Thread(target=self._run, args=(job, func), name=f'schema-job-{job.id}', daemon=True).start()
+        return job
+
+    def _run(self, job, func):
+        job.status = 'running'
+        try:
+            job.result = func(job.set_progress)
+            job.status = 'succeeded'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            connection.close()
+            job.finished_at = time.time()
+            with self._lock:
+                self._running = None
+            job._done.set()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+
+schema_jobs = SchemaJobRunner()
@@ -0,0 +1,127 @@
+"""Shared helpers for the benchmark management commands."""
+import os
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+
+from employees.cache import response_cache
+from employees.changes import change_feed
+from employees.schema import SQL_TYPE_MAPPING, TABLE_NAME, registry as schema_registry
+from employees.search import search_index
+from employees.stats import summary_tables
+from employees.versioning import table_version
+
+FIRST_NAMES = [
+    'Asha', 'Rahul', 'Priya', 'Arjun', 'Meera', 'Vikram', 'Anita', 'Karthik', 'Divya', 'Suresh',
+    'Lakshmi', 'Nikhil', 'Fatima', 'Joseph', 'Neha', 'Imran', 'Sneha', 'Rohan', 'Kavya', 'Aditya',
+]
+LAST_NAMES = [
+    'Menon', 'Nair', 'Pillai', 'Sharma', 'Iyer', 'Reddy', 'Khan', 'Thomas', 'Das', 'Varghese',
+    'Kumar', 'Rao', 'Patel', 'Joshi', 'George', 'Kurian', 'Shetty', 'Bose', 'Gupta', 'Mathew',
+]
+DEPARTMENTS = ['Engineering', 'Finance', 'Marketing', 'Operations', 'Sales', 'Support', 'Legal', 'People']
+
+
+@contextmanager
+def throwaway_database(alias='default'):
+    """
+    Point ``alias`` at a fresh SQLite file with the project tables for the duration of the block.
+
+    Other aliases on the same file (such as the read-only alias) follow it.
+    """
+    original_name = connections[alias].settings_dict['NAME']
+    aliases = [other for other in connections if connections[other].settings_dict['NAME'] == original_name]
+    directory = tempfile.mkdtemp(prefix='employees-bench-')
+    name = os.path.join(directory, 'bench.sqlite3')
+    for other in aliases:
+        connections[other].close()
+        connections[other].settings_dict['NAME'] = name
+    _reset_process_caches()
+    try:
+        call_command('migrate', run_syncdb=True, verbosity=0, database=alias)
+        yield name
+    finally:
+        for other in aliases:
+            connections[other].close()
+            connections[other].settings_dict['NAME'] = original_name
+        _reset_process_caches()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _reset_process_caches():
+    schema_registry.invalidate()
+    search_index.reset()
+    summary_tables.reset()
+    change_feed.reset()
+    table_version.reset()
+    response_cache.invalidate()
+
+
+def add_dynamic_fields(field_types=None):
+    """Add one column per AddFieldView field type; returns {column name: field type}."""
+    field_types = field_types or list(SQL_TYPE_MAPPING)
+    added = {}
+    with connection.cursor() as cursor:
+        for field_type in field_types:
+            name = 'f_' + field_type.replace('.', '_')
+            cursor.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN {name} {SQL_TYPE_MAPPING[field_type]}")
+            added[name] = field_type
+    schema_registry.invalidate()
+    return added
+
+
+def sample_value(field_type, i, rng):
+    if field_type == 'number':
+        return rng.randint(18, 65)
+    if field_type == 'date':
+        return f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if field_type == 'checkbox':
+        return rng.random() < 0.5
+    if field_type == 'email':
+        return f"alt{i}@example.org"
+    if field_type == 'phone':
+        return f"+91 9{rng.randint(100000000, 999999999)}"
+    if field_type == 'url':
+        return f"https://example.com/people/{i}"
+    if field_type in ('image', 'file.txt'):
+        return f"files/{i:08x}.bin"
+    if field_type == 'text':
+        return f"{rng.choice(DEPARTMENTS)} team, {rng.choice(LAST_NAMES)} office"
+    return rng.choice(DEPARTMENTS)
+
+
+def seed_employees(rows, dynamic_fields=None, seed=42, batch_size=5000):
+    """Insert ``rows`` synthetic employees, filling any dynamic fields with type-appropriate values."""
+    rng = random.Random(seed)
+    dynamic_fields = dynamic_fields or {}
+    columns = ['name', 'email', 'phone_number'] + list(dynamic_fields)
+    sql = f"INSERT INTO {TABLE_NAME} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    with connection.cursor() as cursor:
+        for start in range(0, rows, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, rows)):
+                row = [
+                    f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    f"employee{i}@example.com",
+                    f"9{rng.randint(100000000, 999999999)}",
+                ]
+                row.extend(sample_value(field_type, i, rng) for field_type in dynamic_fields.values())
+                batch.append(row)
+            with transaction.atomic():
+                cursor.executemany(sql, batch)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples`` in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f'p{point}': None for point in points}
+    result = {}
+    for point in points:
+        index = max(0, min(len(ordered) - 1, round(point / 100 * len(ordered)) - 1))
+        result[f'p{point}'] = round(ordered[index] * 1000, 3)
+    return result
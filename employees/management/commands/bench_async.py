@@ -0,0 +1,120 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from accounts.tokens import ClaimsRefreshToken
+from employees.async_views import pools
+
+from ._bench import FIRST_NAMES, add_dynamic_fields, percentiles, seed_employees, throwaway_database
+
+MODES = {
+    # Django's test handlers stand in for gunicorn threads and uvicorn: the
+    # views, middleware and database work are the same, only the socket
+    # layer is missing.
+    'wsgi': 'EmployeeCrud.urls',
+    'asgi-sync': 'EmployeeCrud.urls',
+    'asgi-async': 'EmployeeCrud.asgi_urls',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent request throughput of the employee API over WSGI (thread pool), "
+        "ASGI with the synchronous views, and ASGI with the async views, on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+
+    def handle(self, *args, **options):
+        report = {key: options[key] for key in ('rows', 'requests', 'concurrency')}
+        # Every request has to reach the database; a warm response cache would only measure dict lookups.
+        # The test clients send Host: testserver.
+        with throwaway_database(), override_settings(
+            EMPLOYEES_RESPONSE_CACHE={'ENABLED': False}, ALLOWED_HOSTS=['testserver'],
+        ):
+            seed_employees(options['rows'], add_dynamic_fields(['char', 'number', 'date']))
+            user = get_user_model().objects.create_user(
+                email='bench@example.com', username='bench', password='bench',
+            )
+            headers = {'Authorization': f'Bearer {ClaimsRefreshToken.for_user(user).access_token}'}
+            plan = self.request_plan(options['requests'], options['rows'])
+            for mode in options['modes']:
+                with override_settings(ROOT_URLCONF=MODES[mode]):
+                    if mode == 'wsgi':
+                        report[mode] = self.run_wsgi(plan, headers, options['concurrency'])
+                    else:
+                        report[mode] = asyncio.run(self.run_asgi(plan, headers, options['concurrency']))
+                pools.shutdown()
+                connections.close_all()
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def request_plan(self, count, rows):
+        """The same mixed list/search/detail workload for every mode."""
+        rng = random.Random(11)
+        plan = []
+        for _ in range(count):
+            roll = rng.random()
+            if roll < 0.4:
+                plan.append(('/api/employees/', {'limit': 50}))
+            elif roll < 0.7:
+                plan.append(('/api/employees/search/', {'search': rng.choice(FIRST_NAMES)[:4], 'limit': 50}))
+            else:
+                plan.append((f'/api/employees/{rng.randint(1, rows)}/', {}))
+        return plan
+
+    def run_wsgi(self, plan, headers, concurrency):
+        local = threading.local()
+
+        def call(item):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client(headers=headers)
+            started = time.perf_counter()
+            response = client.get(*item)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, plan))
+            # Test clients leave each thread's connection open; close them before the threads go away.
+            list(executor.map(lambda _: connections.close_all(), range(concurrency)))
+        return self.summarize(results, time.perf_counter() - started)
+
+    async def run_asgi(self, plan, headers, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(item):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(*item, headers=headers)
+                if response.streaming:
+                    async for _chunk in response.streaming_content:
+                        pass
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call(item) for item in plan))
+        return self.summarize(results, time.perf_counter() - started)
+
+    def summarize(self, results, elapsed):
+        samples = [duration for duration, _status in results]
+        errors = sum(1 for _duration, status in results if status != 200)
+        return dict(
+            percentiles(samples),
+            requests_per_second=round(len(results) / elapsed, 1),
+            errors=errors,
+        )
@@ -0,0 +1,66 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import ClaimsJWTAuthentication, user_states
+from accounts.tokens import ClaimsRefreshToken
+
+from ._bench import percentiles, seed_employees, throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare simplejwt's JWTAuthentication with the claims-based fast path: authentication latency, "
+        "user-table queries per request, and total queries for an employee detail request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        report = {'requests': count}
+        with throwaway_database(), override_settings(ALLOWED_HOSTS=['testserver']):
+            seed_employees(100)
+            user = get_user_model().objects.create_user(email='bench@example.com', username='bench', password='bench')
+            plain_token = str(RefreshToken.for_user(user).access_token)
+            claims_token = str(ClaimsRefreshToken.for_user(user).access_token)
+            cases = {
+                'simplejwt': (JWTAuthentication(), plain_token),
+                'claims': (ClaimsJWTAuthentication(), claims_token),
+                # Tokens issued before the claims existed take the TTL-cached live check.
+                'claims_legacy_token': (ClaimsJWTAuthentication(), plain_token),
+            }
+            factory = RequestFactory()
+            user_states.invalidate()
+            for label, (authenticator, token) in cases.items():
+                request = factory.get('/api/employees/1/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                samples = []
+                with CaptureQueriesContext(connections['default']) as captured:
+                    for _ in range(count):
+                        started = time.perf_counter()
+                        authenticator.authenticate(request)
+                        samples.append(time.perf_counter() - started)
+                report[label] = dict(
+                    percentiles(samples),
+                    user_queries_per_request=round(len(captured) / count, 3),
+                )
+
+            # End to end: the detail endpoint with the configured (claims) authentication.
+            # Server-Timing counts the queries on every alias, including the read-only one.
+            client = Client(headers={'Authorization': f'Bearer {claims_token}'})
+            client.get('/api/employees/1/')
+            with CaptureQueriesContext(connections['default']) as captured:
+                response = client.get('/api/employees/1/')
+            report['detail_request'] = {
+                'server_timing': response['Server-Timing'],
+                'user_table_queries': sum(1 for query in captured if 'accounts_user' in query['sql']),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,61 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from employees.pagination import KeysetPage
+from employees.schema import TABLE_NAME
+from employees.search import like_clause, search_index
+
+from ._bench import FIRST_NAMES, LAST_NAMES, add_dynamic_fields, percentiles, seed_employees, throwaway_database
+
+
+class Command(BaseCommand):
+    help = "Compare employee search latency of the FTS5 index against the LIKE scan on a throwaway database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=None, help="Page size; omit to fetch every match.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        # A mix of very common prefixes, whole surnames and near-unique email prefixes.
+        count = options['queries']
+        terms = [rng.choice(FIRST_NAMES)[:rng.randint(3, 5)] for _ in range(count // 3)]
+        terms += [rng.choice(LAST_NAMES) for _ in range(count // 3)]
+        terms += [f"employee{rng.randrange(options['rows'])}" for _ in range(count - len(terms))]
+        page = KeysetPage(limit=options['limit'])
+
+        with throwaway_database():
+            seed_employees(options['rows'], add_dynamic_fields(['char', 'text']))
+            started = time.perf_counter()
+            if not search_index.ensure():
+                self.stderr.write("FTS5 is not available in this SQLite build.")
+                return
+            build_seconds = time.perf_counter() - started
+
+            report = {
+                'rows': options['rows'],
+                'queries': len(terms),
+                'limit': options['limit'],
+                'fts_build_seconds': round(build_seconds, 3),
+            }
+            for label, make_clause in (('like', like_clause), ('fts', search_index.clause)):
+                samples, matches = [], 0
+                with connection.cursor() as cursor:
+                    for term in terms:
+                        clause = make_clause(term)
+                        query, params = page.apply(
+                            f"SELECT {TABLE_NAME}.* FROM {clause.from_sql}",
+                            clause.where, clause.params, clause.order_by, clause.key,
+                        )
+                        started = time.perf_counter()
+                        cursor.execute(query, params)
+                        matches += len(cursor.fetchall())
+                        samples.append(time.perf_counter() - started)
+                report[label] = dict(percentiles(samples), mean_matches=round(matches / len(terms), 1))
+
+        self.stdout.write(json.dumps(report, indent=2))
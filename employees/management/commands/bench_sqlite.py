@@ -0,0 +1,139 @@
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from employees.routing import READ_ONLY_ALIAS, read_connection
+from employees.schema import TABLE_NAME
+
+from ._bench import percentiles, seed_employees, throwaway_database
+
+# 'stock' reproduces Django's plain sqlite3 backend: rollback journal,
+# synchronous=FULL, the sqlite3 module's 5 second timeout, deferred
+# transactions, and reads on the default connection. 'tuned' uses
+# settings.DATABASES as configured.
+PROFILES = {
+    'stock': {
+        'pragmas': {
+            'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': None,
+            'mmap_size': None, 'cache_size': None, 'temp_store': None,
+        },
+    },
+    'tuned': None,
+}
+
+
+class Command(BaseCommand):
+    help = "Run concurrent reads and writes against stock and tuned SQLite connection settings on throwaway databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+
+    def handle(self, *args, **options):
+        report = {key: options[key] for key in ('rows', 'readers', 'writers', 'seconds')}
+        for profile in options['profiles']:
+            # A fresh file per profile: journal_mode=WAL is a property of the database file.
+            with throwaway_database(), self.profile(PROFILES[profile]):
+                seed_employees(options['rows'])
+                report[profile] = self.run(options)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @contextmanager
+    def profile(self, options):
+        aliases = [alias for alias in (DEFAULT_DB_ALIAS, READ_ONLY_ALIAS) if alias in connections.settings]
+        saved = {alias: connections[alias].settings_dict['OPTIONS'] for alias in aliases}
+        if options is not None:
+            for alias in aliases:
+                connections[alias].close()
+                connections[alias].settings_dict['OPTIONS'] = dict(options)
+        self.readers_on_default = options is not None
+        try:
+            yield
+        finally:
+            for alias in aliases:
+                connections[alias].close()
+                connections[alias].settings_dict['OPTIONS'] = saved[alias]
+
+    def run(self, options):
+        deadline = time.perf_counter() + options['seconds']
+        rows = options['rows']
+        results = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        lock = threading.Lock()
+
+        def reader(seed):
+            rng = random.Random(seed)
+            samples, failed = [], 0
+            conn = connections[DEFAULT_DB_ALIAS] if self.readers_on_default else read_connection()
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(
+                            f"SELECT * FROM {TABLE_NAME} WHERE id > %s ORDER BY id LIMIT 50", [rng.randint(0, rows)]
+                        )
+                        cursor.fetchall()
+                        cursor.execute(f"SELECT * FROM {TABLE_NAME} WHERE id = %s", [rng.randint(1, rows)])
+                        cursor.fetchone()
+                except OperationalError:
+                    failed += 1
+                    continue
+                samples.append(time.perf_counter() - started)
+            finish('read', samples, failed)
+
+        def writer(seed):
+            rng = random.Random(seed)
+            samples, failed = [], 0
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        # Read-then-write, like the bulk and import endpoints.
+                        with transaction.atomic():
+                            cursor.execute(f"SELECT phone_number FROM {TABLE_NAME} WHERE id = %s", [rng.randint(1, rows)])
+                            cursor.fetchone()
+                            cursor.execute(
+                                f"UPDATE {TABLE_NAME} SET phone_number = %s WHERE id = %s",
+                                [str(rng.randint(100000000, 999999999)), rng.randint(1, rows)],
+                            )
+                            cursor.execute(
+                                f"INSERT INTO {TABLE_NAME} (name, email, phone_number) VALUES (%s, %s, %s)",
+                                ['Bench Writer', f'writer{seed}-{len(samples)}-{failed}@example.com', '9000000000'],
+                            )
+                    except OperationalError:
+                        failed += 1
+                        continue
+                    samples.append(time.perf_counter() - started)
+            finish('write', samples, failed)
+
+        def finish(kind, samples, failed):
+            connections.close_all()
+            with lock:
+                results[kind].extend(samples)
+                errors[kind] += failed
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            kind: dict(
+                percentiles(samples),
+                ops_per_second=round(len(samples) / elapsed, 1),
+                locked_errors=errors[kind],
+            )
+            for kind, samples in results.items()
+        }
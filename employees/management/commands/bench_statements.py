@@ -0,0 +1,117 @@
+import json
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from employees.projection import build_detail_query, detail_query, requested_fields
+from employees.schema import request_scope
+from employees.statements import statement_cache
+from employees.storage import build_insert, build_update, insert_statement, update_statement
+
+from ._bench import add_dynamic_fields, sample_value, seed_employees, throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark of the per-request statement work of create, update and detail requests: "
+        "building the SQL on every request versus the compiled statement cache, with and without executing it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--rows', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        report = {'requests': count}
+        with throwaway_database():
+            fields = add_dynamic_fields()
+            seed_employees(options['rows'], fields)
+            rng = random.Random(5)
+            payloads = []
+            for i in range(count):
+                values = {'name': f'Bench {i}', 'email': f'bench{i}@example.org', 'phone_number': str(i)}
+                values.update((name, sample_value(field_type, i, rng)) for name, field_type in fields.items())
+                names = list(values)
+                # Clients send the same fields in whatever order their form produced.
+                rng.shuffle(names)
+                payloads.append({name: values[name] for name in names})
+            detail_fields = requested_fields(None)
+
+            builders = {
+                'rebuilt': (
+                    lambda names: build_insert(names),
+                    lambda names: build_update(names, "id = %s"),
+                    lambda: build_detail_query(detail_fields),
+                ),
+                'cached': (
+                    insert_statement,
+                    lambda names: update_statement(names, "id = %s"),
+                    lambda: detail_query(detail_fields),
+                ),
+            }
+            for label, (insert, update, detail) in builders.items():
+                statement_cache.reset()
+                report[label] = {
+                    'build': self.measure(payloads, insert, update, detail, execute=False),
+                    'build_and_execute': self.measure(payloads, insert, update, detail, execute=True),
+                }
+            report['cached']['cache'] = statement_cache.stats()
+            for kind in ('build', 'build_and_execute'):
+                report[f'cpu_saved_us_per_request_{kind}'] = round(
+                    report['rebuilt'][kind]['cpu_us_per_request'] - report['cached'][kind]['cpu_us_per_request'], 2
+                )
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, payloads, insert, update, detail, execute):
+        """CPU time per request (one create, one update and one detail read) and queries per operation."""
+        started = time.process_time()
+        self.run(payloads, insert, update, detail, execute)
+        elapsed = time.process_time() - started
+        sample = payloads[:100]
+        self.queries = Counter()
+        with connection.execute_wrapper(self.count_query):
+            self.run(sample, insert, update, detail, execute)
+        return {
+            'cpu_us_per_request': round(elapsed / len(payloads) * 1e6, 2),
+            'queries_per_operation': {
+                operation: round(self.queries[operation] / len(sample), 2)
+                for operation in ('create', 'update', 'detail')
+            },
+        }
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries[self.operation] += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def operation_scope(self, operation):
+        # Like a request: the schema stamp is read at most once per operation.
+        self.operation = operation
+        with request_scope():
+            yield
+
+    def run(self, payloads, insert, update, detail, execute):
+        # Rolled back, so every pass starts from the seeded table.
+        with transaction.atomic(), connection.cursor() as cursor:
+            for values in payloads:
+                names = list(values)
+                with self.operation_scope('create'):
+                    statement = insert(names)
+                    if execute:
+                        cursor.execute(statement.sql, statement.params(values))
+                        pk = cursor.lastrowid
+                with self.operation_scope('update'):
+                    changes = update(names[:3])
+                    if execute:
+                        cursor.execute(changes.sql, changes.params(values) + [pk])
+                with self.operation_scope('detail'):
+                    query = detail()
+                    if execute:
+                        cursor.execute(query, [pk])
+                        cursor.fetchone()
+            transaction.set_rollback(True)
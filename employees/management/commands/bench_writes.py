@@ -0,0 +1,109 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from accounts.tokens import ClaimsRefreshToken
+from employees.writes import group_commit
+
+from ._bench import FIRST_NAMES, percentiles, seed_employees, throwaway_database
+
+MODES = {
+    'autocommit': {'ENABLED': False},
+    'group-commit': {'ENABLED': True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent employee creates and updates with one commit per request and with group commit, "
+        "on a throwaway database, for each of the given synchronous settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--requests', type=int, default=3000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+        parser.add_argument('--synchronous', nargs='+', choices=['NORMAL', 'FULL'], default=['NORMAL', 'FULL'])
+        parser.add_argument('--max-delay-ms', type=float, default=2)
+
+    def handle(self, *args, **options):
+        report = {key: options[key] for key in ('rows', 'requests', 'concurrency', 'max_delay_ms')}
+        database = connections['default'].settings_dict
+        original_options = database['OPTIONS']
+        try:
+            for synchronous in options['synchronous']:
+                database['OPTIONS'] = {**original_options, 'pragmas': {'synchronous': synchronous}}
+                report[f'synchronous={synchronous}'] = self.run_modes(options)
+        finally:
+            database['OPTIONS'] = original_options
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_modes(self, options):
+        results = {}
+        for mode in options['modes']:
+            # A fresh database per mode, so both start from the same table size.
+            with throwaway_database(), override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                EMPLOYEES_GROUP_COMMIT={**MODES[mode], 'MAX_DELAY_MS': options['max_delay_ms']},
+            ):
+                seed_employees(options['rows'])
+                user = get_user_model().objects.create_user(
+                    email='bench@example.com', username='bench', password='bench',
+                )
+                headers = {'Authorization': f'Bearer {ClaimsRefreshToken.for_user(user).access_token}'}
+                plan = self.request_plan(options['requests'], options['rows'])
+                results[mode] = self.run(plan, headers, options['concurrency'])
+                if group_commit.enabled:
+                    results[mode]['mean_batch_size'] = group_commit.stats()['mean_batch_size']
+                group_commit.shutdown()
+                connections.close_all()
+        return results
+
+    def request_plan(self, count, rows):
+        """Creates and single-field updates of random existing rows, the same for every mode."""
+        rng = random.Random(7)
+        plan = []
+        for i in range(count):
+            name = f"{rng.choice(FIRST_NAMES)} {i}"
+            if rng.random() < 0.6:
+                plan.append(('post', '/api/employees/', {
+                    'name': name, 'email': f'writer{i}@example.com', 'phone_number': str(i),
+                }))
+            else:
+                plan.append(('put', f'/api/employees/{rng.randint(1, rows)}/', {'name': name}))
+        return plan
+
+    def run(self, plan, headers, concurrency):
+        local = threading.local()
+
+        def call(item):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = APIClient(headers=headers)
+            method, path, data = item
+            started = time.perf_counter()
+            # The detail view reads form data, so both go as multipart like the frontend's forms.
+            response = getattr(client, method)(path, data, format='multipart')
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, plan))
+            # Test clients leave each thread's connection open; close them before the threads go away.
+            list(executor.map(lambda _: connections.close_all(), range(concurrency)))
+        elapsed = time.perf_counter() - started
+        samples = [duration for duration, _status in results]
+        return dict(
+            percentiles(samples),
+            requests_per_second=round(len(results) / elapsed, 1),
+            errors=sum(1 for _duration, status in results if status not in (200, 201)),
+        )
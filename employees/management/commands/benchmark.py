@@ -0,0 +1,227 @@
+import asyncio
+import json
+import platform
+import random
+import re
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from accounts.tokens import ClaimsRefreshToken
+from employees.pagination import encode_cursor
+from employees.schema import SQL_TYPE_MAPPING
+from employees.storage import convert_to_json
+
+from ._bench import FIRST_NAMES, LAST_NAMES, add_dynamic_fields, percentiles, sample_value, seed_employees, throwaway_database
+
+OPERATIONS = ['list', 'search', 'detail', 'create', 'update', 'delete', 'add_field', 'drop_field']
+
+URLCONFS = {
+    'wsgi': 'EmployeeCrud.urls',
+    'asgi': 'EmployeeCrud.asgi_urls',
+}
+
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+class TestClientDriver:
+    """Sends requests through Django's test client, which runs the full WSGI handler and middleware."""
+
+    def __init__(self, headers):
+        self.client = Client(headers=headers)
+
+    def request(self, method, path, **kwargs):
+        return getattr(self.client, method)(path, **kwargs)
+
+    def close(self):
+        pass
+
+
+class AsyncClientDriver:
+    """Sends requests through Django's in-process ASGI client on one event loop."""
+
+    def __init__(self, headers):
+        self.client = AsyncClient()
+        self.headers = headers
+        self.loop = asyncio.new_event_loop()
+
+    def request(self, method, path, **kwargs):
+        return self.loop.run_until_complete(getattr(self.client, method)(path, headers=self.headers, **kwargs))
+
+    def close(self):
+        self.loop.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway SQLite database and drive the employee API (list, search, detail, create, update, "
+        "delete, add-field, drop-field) in process; prints latency percentiles, throughput, query counts and "
+        "peak RSS as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=200, help="Requests per read/write operation.")
+        parser.add_argument('--schema-ops', type=int, default=10, help="Fields added and then dropped.")
+        parser.add_argument('--client', choices=list(URLCONFS), default='wsgi')
+        parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=OPERATIONS)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--response-cache', action='store_true', help="Leave the list response cache on.")
+        parser.add_argument(
+            '--storage', choices=['columns', 'json'], default='columns',
+            help="How dynamic fields are stored; 'json' converts the seeded table before measuring.",
+        )
+        parser.add_argument('--output', help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        report = {
+            'environment': self.environment(),
+            'options': {key: options[key] for key in (
+                'rows', 'requests', 'schema_ops', 'client', 'operations', 'seed', 'response_cache', 'storage',
+            )},
+        }
+        overrides = {
+            'ROOT_URLCONF': URLCONFS[options['client']],
+            # The test clients send Host: testserver.
+            'ALLOWED_HOSTS': ['testserver'],
+            # Query counts come from the Server-Timing header; slow statements are not the point here.
+            'EMPLOYEES_INSTRUMENTATION': {'ENABLED': True, 'SERVER_TIMING': True, 'SLOW_QUERY_MS': None},
+        }
+        if not options['response_cache']:
+            overrides['EMPLOYEES_RESPONSE_CACHE'] = {'ENABLED': False}
+
+        with throwaway_database(), override_settings(**overrides):
+            started = time.perf_counter()
+            self.dynamic_fields = add_dynamic_fields(list(SQL_TYPE_MAPPING))
+            seed_employees(options['rows'], self.dynamic_fields, seed=options['seed'])
+            if options['storage'] == 'json':
+                convert_to_json()
+            report['seed_seconds'] = round(time.perf_counter() - started, 3)
+            report['rss_after_seed_kb'] = peak_rss_kb()
+
+            user = get_user_model().objects.create_user(
+                email='benchmark@example.com', username='benchmark', password='benchmark',
+            )
+            headers = {'Authorization': f'Bearer {ClaimsRefreshToken.for_user(user).access_token}'}
+            driver_class = AsyncClientDriver if options['client'] == 'asgi' else TestClientDriver
+            driver = driver_class(headers)
+            self.rng = random.Random(options['seed'])
+            self.rows = options['rows']
+            self.created_ids = []
+            self.added_fields = []
+            try:
+                report['operations'] = {
+                    operation: self.measure(driver, operation, options)
+                    for operation in OPERATIONS if operation in options['operations']
+                }
+            finally:
+                driver.close()
+                connections.close_all()
+        report['peak_rss_kb'] = peak_rss_kb()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def measure(self, driver, operation, options):
+        count = options['schema_ops'] if operation in ('add_field', 'drop_field') else options['requests']
+        make_request = getattr(self, f'request_{operation}')
+        samples, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for i in range(count):
+            method, path, kwargs, expected = make_request(i)
+            request_started = time.perf_counter()
+            response = driver.request(method, path, **kwargs)
+            samples.append(time.perf_counter() - request_started)
+            if response.status_code != expected:
+                errors += 1
+            match = QUERY_COUNT.search(response.get('Server-Timing', ''))
+            if match:
+                queries.append(int(match.group(1)))
+        elapsed = time.perf_counter() - started
+        return dict(
+            percentiles(samples),
+            requests=count,
+            requests_per_second=round(count / elapsed, 1) if elapsed else None,
+            mean_queries=round(sum(queries) / len(queries), 2) if queries else None,
+            max_queries=max(queries, default=None),
+            errors=errors,
+            peak_rss_kb=peak_rss_kb(),
+        )
+
+    def random_id(self):
+        return self.rng.randint(1, self.rows)
+
+    def request_list(self, i):
+        return 'get', '/api/employees/', {'data': {'limit': 50, 'after': encode_cursor(self.random_id())}}, 200
+
+    def request_search(self, i):
+        term = self.rng.choice([self.rng.choice(FIRST_NAMES)[:4], self.rng.choice(LAST_NAMES)])
+        return 'get', '/api/employees/search/', {'data': {'search': term, 'limit': 50}}, 200
+
+    def request_detail(self, i):
+        return 'get', f'/api/employees/{self.random_id()}/', {}, 200
+
+    def request_create(self, i):
+        data = {'name': 'Bench Created', 'email': f'created{i}@example.com', 'phone_number': f'8{i:09d}'}
+        for column, field_type in self.dynamic_fields.items():
+            data[column] = sample_value(field_type, i, self.rng)
+        self.created_ids.append(self.rows + i + 1)
+        return 'post', '/api/employees/', {'data': data, 'content_type': 'application/json'}, 201
+
+    def request_update(self, i):
+        # EmployeeDetailView.put reads form data.
+        return 'put', f'/api/employees/{self.random_id()}/', {
+            'data': f'name=Bench+Updated+{i}&phone_number=7{i:09d}',
+            'content_type': 'application/x-www-form-urlencoded',
+        }, 200
+
+    def request_delete(self, i):
+        pk = self.created_ids.pop() if self.created_ids else self.rows - i
+        return 'delete', f'/api/employees/{pk}/', {}, 204
+
+    def request_add_field(self, i):
+        field_type = list(SQL_TYPE_MAPPING)[i % len(SQL_TYPE_MAPPING)]
+        field_name = f'bench_extra_{i}'
+        self.added_fields.append(field_name)
+        return 'post', '/api/employees/add-field/', {
+            'data': {'field_name': field_name, 'field_type': field_type}, 'content_type': 'application/json',
+        }, 201
+
+    def request_drop_field(self, i):
+        field_name = self.added_fields.pop() if self.added_fields else list(self.dynamic_fields)[0]
+        return 'delete', '/api/employees/add-field/', {
+            'data': {'field_name': field_name}, 'content_type': 'application/json',
+        }, 200
+
+    def environment(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': sys.platform,
+        }
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far (ru_maxrss is in bytes on macOS, KiB elsewhere)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from employees.changes import change_feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove tombstones of deleted employees from the change feed once they are older than the retention. "
+        "Clients that last synced before the removed tombstones have to start again from sequence 0."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention', type=int, default=None,
+            help="Keep tombstones younger than this many seconds (default: the TOMBSTONE_RETENTION setting).",
+        )
+
+    def handle(self, *args, **options):
+        removed = change_feed.compact(options['retention'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} tombstone(s)."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.schema import registry as schema_registry
+from employees.signals import schema_changed
+from employees.storage import compact, convert_to_columns, convert_to_json
+
+
+class Command(BaseCommand):
+    help = (
+        "Show or change how dynamic employee fields are stored: as table columns (every field change is DDL) "
+        "or as keys of one JSON column described by a metadata table (field changes only touch metadata)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('storage', nargs='?', choices=['columns', 'json'], help="Convert to this storage mode.")
+        parser.add_argument(
+            '--compact', action='store_true',
+            help="In JSON mode, remove the values of dropped fields from every row.",
+        )
+
+    def handle(self, *args, **options):
+        target = options['storage']
+        current = schema_registry.storage
+        if target and target != current:
+            convert = convert_to_json if target == 'json' else convert_to_columns
+            try:
+                result = convert()
+            except ValueError as e:
+                raise CommandError(str(e))
+            schema_changed.send(sender=self.__class__, operation='storage', field_name=None)
+            self.stdout.write(self.style.SUCCESS(
+                f"Moved {result['fields']} field(s) to {target} storage; recreated {result['indexes']} index(es)."
+            ))
+        elif target:
+            self.stdout.write(f"Dynamic fields are already stored as {current}.")
+
+        if options['compact']:
+            try:
+                rows = compact()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Compacted {rows} row(s)."))
+
+        if not target and not options['compact']:
+            fields = [column.name for column in schema_registry.columns() if column.json_key is not None]
+            self.stdout.write(f"Storage: {schema_registry.storage}")
+            if fields:
+                self.stdout.write(f"JSON fields: {', '.join(fields)}")
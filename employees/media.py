@@ -0,0 +1,179 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from .uploads import UPLOAD_DIR
+
+DEFAULTS = {
+    # None serves files from Django; 'x-accel' (nginx) or 'x-sendfile' (Apache,
+    # lighttpd) hands the file to the front server after the permission check.
+    'SENDFILE_BACKEND': None,
+    # nginx "internal" location that maps to MEDIA_ROOT, used with 'x-accel'.
+    'X_ACCEL_PREFIX': '/protected-media/',
+    # Lifetime of content-addressed files in browser caches; their bytes never change.
+    'IMMUTABLE_MAX_AGE': 365 * 24 * 3600,
+}
+
+# Names given by uploads.content_path: the directory is the first two digits of the SHA-256.
+CONTENT_ADDRESSED = re.compile(rf'^{UPLOAD_DIR}/(?P<prefix>[0-9a-f]{{2}})/(?P<digest>[0-9a-f]{{64}})(?:\.[^/]*)?$')
+SINGLE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def media_options():
+    return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_MEDIA', {})}
+
+
+def content_digest_of(name):
+    """The SHA-256 a content-addressed storage name was derived from, or None."""
+    match = CONTENT_ADDRESSED.match(name)
+    if match is None or match['digest'][:2] != match['prefix']:
+        return None
+    return match['digest']
+
+
+def byte_range(header, size):
+    """
+    Inclusive (start, end) of a single-range ``Range`` header, or None to send the whole file.
+
+    Malformed headers and multiple ranges are ignored, which HTTP allows.
+    Raises ValueError when the range lies outside the file.
+    """
+    match = SINGLE_RANGE.match(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # "bytes=-500": the last 500 bytes.
+        if int(last) == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class FileRange:
+    """
+    Read-only view of ``length`` bytes of an open file, starting at its current position.
+
+    ``fileno`` is passed through, so a WSGI server's file_wrapper can sendfile()
+    the range straight from the descriptor: it starts at the descriptor's
+    offset and stops after Content-Length bytes.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+class AnyAcceptNegotiation(BaseContentNegotiation):
+    """Let <img> tags and downloads ask for image/* or */*; errors are still rendered as JSON."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class MediaView(APIView):
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = AnyAcceptNegotiation
+
+    def get(self, request, path):
+        """Serve an uploaded file to authenticated users, with byte ranges and cache validators."""
+        try:
+            full_path = default_storage.path(path)
+        except SuspiciousFileOperation:
+            raise Http404("File not found")
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            raise Http404("File not found")
+        if not os.path.isfile(full_path):
+            raise Http404("File not found")
+
+        options = media_options()
+        digest = content_digest_of(path)
+        etag = quote_etag(digest or f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        last_modified = int(stat.st_mtime)
+        validators = {
+            'ETag': etag,
+            'Last-Modified': http_date(last_modified),
+            # A content-addressed name always has the same bytes; anything else may be replaced in place.
+            'Cache-Control': (
+                f"private, max-age={options['IMMUTABLE_MAX_AGE']}, immutable" if digest else 'private, no-cache'
+            ),
+        }
+
+        cached = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if cached is not None:
+            for header, value in validators.items():
+                cached[header] = value
+            return cached
+
+        backend = options['SENDFILE_BACKEND']
+        if backend:
+            # The front server does the ranges and conditional requests from here on.
+            response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+            if backend == 'x-accel':
+                response['X-Accel-Redirect'] = options['X_ACCEL_PREFIX'].rstrip('/') + '/' + path
+            else:
+                response['X-Sendfile'] = full_path
+            return self.finish(response, validators)
+
+        requested = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if requested and if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+            # The client's partial copy is of another version: send it the whole file.
+            requested = None
+        try:
+            span = byte_range(requested, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return self.finish(response, validators)
+
+        file = open(full_path, 'rb')
+        if span is None:
+            response = FileResponse(file)
+        else:
+            start, end = span
+            file.seek(start)
+            response = FileResponse(FileRange(file, end - start + 1), status=206)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        return self.finish(response, validators)
+
+    def finish(self, response, validators):
+        response['Accept-Ranges'] = 'bytes'
+        for header, value in validators.items():
+            response[header] = value
+        return response
@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .instrumentation import (
+    RequestTimer, current_timer, endpoint_stats, instrument_connections, options, server_timing, timed_render,
+)
+
+
+class RequestTimingMiddleware:
+    """
+    Count and time the SQL each request runs, split the request time into
+    DB, serialization and remaining app time, add a Server-Timing header and
+    feed the per-endpoint histograms served by RequestStatsView.
+
+    Under ASGI it runs on the event loop, so Django does not push the whole
+    middleware chain onto asgiref's single thread-sensitive executor; the
+    async views instrument their own pool threads (see async_views.run_in_pool).
+
+    Queries that a streamed response runs after the view returns are not included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django wraps synchronous hooks of an async middleware in sync_to_async; these never block.
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        settings = options()
+        if not settings['ENABLED']:
+            return self.get_response(request)
+
+        timer = RequestTimer(endpoint=f"{request.method} <unresolved>")
+        token = current_timer.set(timer)
+        try:
+            with instrument_connections():
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(timer, response, settings)
+
+    async def __acall__(self, request):
+        settings = options()
+        if not settings['ENABLED']:
+            return await self.get_response(request)
+
+        timer = RequestTimer(endpoint=f"{request.method} <unresolved>")
+        token = current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(timer, response, settings)
+
+    def finish(self, timer, response, settings):
+        summary = timer.summary()
+        endpoint_stats.record(timer.endpoint, summary, settings['HISTOGRAM_BUCKETS_MS'])
+        if settings['SERVER_TIMING']:
+            response['Server-Timing'] = server_timing(summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timer = current_timer.get()
+        if timer is not None:
+            timer.endpoint = f"{request.method} /{request.resolver_match.route}"
+
+    def process_template_response(self, request, response):
+        # Django renders DRF responses right after this hook.
+        response.render = timed_render(response.render)
+        return response
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return RequestTimingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    async def _aprocess_template_response(self, request, response):
+        return RequestTimingMiddleware.process_template_response(self, request, response)
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id):
+    """Build the opaque cursor pointing just past ``last_id``."""
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload['id']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+class KeysetPage:
+    """
+    Keyset (seek) pagination on the employee id.
+
+    ``?limit=`` turns pagination on; ``?after=`` takes the opaque cursor
+    returned as ``next`` by the previous page. Without either parameter the
+    whole table is returned, as before.
+    """
+
+    def __init__(self, limit=None, after=None):
+        self.limit = limit
+        self.after = after
+
+    @classmethod
+    def from_request(cls, request):
+        limit = request.GET.get('limit')
+        after = request.GET.get('after')
+        if limit is None and after is None:
+            return cls()
+        if limit is None:
+            limit = DEFAULT_PAGE_SIZE
+        else:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError("limit must be an integer")
+            if limit < 1:
+                raise ValueError("limit must be positive")
+            limit = min(limit, MAX_PAGE_SIZE)
+        return cls(limit, decode_cursor(after) if after else None)
+
+    @property
+    def enabled(self):
+        return self.limit is not None
+
+    def apply(self, query, where, params, order_by=None, key="id"):
+        """
+        Add the seek predicate, ordering and limit to a SELECT on the employee table.
+
+        ``order_by`` is only honoured for unpaginated reads; pages are always
+        ordered by ``key``, an expression equal to the employee id.
+        """
+        where = list(where)
+        params = list(params)
+        if self.after is not None:
+            where.append(f"{key} > %s")
+            params.append(self.after)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if self.enabled or not order_by:
+            order_by = key
+        query += f" ORDER BY {order_by}"
+        if self.enabled:
+            # One extra row tells us whether there is a next page.
+            query += " LIMIT %s"
+            params.append(self.limit + 1)
+        return query, params
+
+    def next_cursor(self, rows, id_index):
+        """Trim the look-ahead row and return the cursor for the following page."""
+        if not self.enabled or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        return rows, encode_cursor(rows[-1][id_index])
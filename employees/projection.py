@@ -0,0 +1,64 @@
+from django.db import connection
+
+from .schema import TABLE_NAME, registry as schema_registry
+from .statements import statement_cache
+
+# Columns of these types (file and image fields) are left out of reads unless asked for.
+HEAVY_SQL_TYPES = ('BLOB',)
+
+
+def is_heavy(column):
+    return any(sql_type in column.sql_type.upper() for sql_type in HEAVY_SQL_TYPES)
+
+
+def default_fields():
+    """Every column except the heavy ones, in table order."""
+    return [column.name for column in schema_registry.columns() if not is_heavy(column)]
+
+
+def requested_fields(value, required=('id',)):
+    """
+    Column names to read for a ``?fields=`` value.
+
+    No value selects the default fields and ``*`` selects every column.
+    Otherwise the comma separated names are checked against the schema
+    (ValueError on unknown ones) and ``required`` columns are added in front.
+    """
+    if not value:
+        return default_fields()
+    if value.strip() == '*':
+        return schema_registry.names()
+    names = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    unknown = [name for name in names if schema_registry.get(name) is None]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [name for name in required if name not in names] + names
+
+
+def select_list(fields, table=TABLE_NAME):
+    """Quoted, table-qualified column list, safe to use with the search join; JSON fields are read by name."""
+    # Keyed by the fields in order: rows are zipped with them.
+    return statement_cache.get('select', fields, build_select_list, table)
+
+
+def detail_query(fields):
+    """SELECT of one employee by id."""
+    return statement_cache.get('detail', fields, build_detail_query)
+
+
+def build_detail_query(fields):
+    return f"SELECT {select_list(fields)} FROM {TABLE_NAME} WHERE id = %s"
+
+
+def build_select_list(fields, table):
+    qn = connection.ops.quote_name
+    selected = []
+    for name, expression in zip(fields, schema_registry.expressions(fields, table)):
+        plain = f"{table}.{qn(name)}"
+        selected.append(plain if expression == plain else f"{expression} AS {qn(name)}")
+    return ', '.join(selected)
+
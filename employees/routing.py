@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ONLY_ALIAS = 'readonly'
+
+
+def read_connection():
+    """
+    Connection for read-only queries.
+
+    Uses the read-only alias when one is configured, so list and detail
+    reads get their own persistent connections and never queue behind the
+    default connection's writes. Reads stay on the default connection
+    inside one of its transactions, so they see its uncommitted changes,
+    and for in-memory databases (tests), where a second connection only
+    adds shared-cache table locks.
+    """
+    default = connections[DEFAULT_DB_ALIAS]
+    if READ_ONLY_ALIAS not in settings.DATABASES or default.in_atomic_block:
+        return default
+    reader = connections[READ_ONLY_ALIAS]
+    if reader.is_in_memory_db():
+        return default
+    return reader
@@ -0,0 +1,268 @@
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.signals import request_finished, request_started
+from django.db import OperationalError, connection
+from django.dispatch import receiver
+
+from .signals import schema_changed
+
+TABLE_NAME = 'employees_employee'
+
+# Logical field types offered by the settings screen and the SQL type each one is stored as.
+SQL_TYPE_MAPPING = {
+    'char': 'VARCHAR(150)',
+    'text': 'VARCHAR(300)',
+    'number': 'INTEGER',
+    'date': 'DATE',
+    'email': 'VARCHAR(254)',
+    'phone': 'VARCHAR(20)',
+    'url': 'VARCHAR(720)',
+    'checkbox': 'BOOLEAN',
+    'image': 'BLOB',
+    'file.txt': 'BLOB',
+}
+
+# JSON storage mode (see employees.storage): dynamic fields are keys of one JSON column and their
+# definitions rows of FIELD_TABLE, whose changes bump the counter in FIELD_VERSION_TABLE.
+ATTRIBUTES_COLUMN = 'attributes'
+FIELD_TABLE = 'employees_dynamic_field'
+FIELD_VERSION_TABLE = 'employees_dynamic_field_version'
+
+# ``json_key`` is set for fields stored in the JSON column; ``promoted`` ones are also
+# readable through a generated column of the same name, which can be indexed.
+Column = namedtuple(
+    'Column', ['name', 'sql_type', 'field_type', 'notnull', 'default', 'pk', 'json_key', 'promoted'],
+    defaults=(None, False),
+)
+
+# ``columns`` holds None for expression terms.
+Index = namedtuple('Index', ['name', 'columns', 'unique', 'partial'])
+
+
+def logical_type(sql_type):
+    """Map a declared SQL type back to the closest AddFieldView field type."""
+    declared = (sql_type or '').upper()
+    for field_type, mapped in SQL_TYPE_MAPPING.items():
+        if mapped == declared:
+            return field_type
+    # Columns created by the Employee model (id, name, ...) use Django's own spelling.
+    if 'INT' in declared:
+        return 'number'
+    if 'BOOL' in declared:
+        return 'checkbox'
+    if 'BLOB' in declared:
+        return 'file.txt'
+    if 'DATE' in declared:
+        return 'date'
+    return 'char'
+
+
+def json_path(key):
+    return f"'$.\"{key}\"'"
+
+
+def json_value_sql(table, key):
+    """SQL reading the JSON attribute ``key`` of a row of the employee table (or a trigger's new/old)."""
+    return f"json_extract({table}.{connection.ops.quote_name(ATTRIBUTES_COLUMN)}, {json_path(key)})"
+
+
+def value_sql(column, table):
+    """SQL reading ``column`` from a row of the employee table, a trigger's new/old row, or a view over it."""
+    if column.json_key:
+        return json_value_sql(table, column.json_key)
+    return f'{table}.{connection.ops.quote_name(column.name)}'
+
+
+# Versions already checked by the current request, by table; None outside a request.
+_checked_versions = ContextVar('employees_schema_checked_versions', default=None)
+
+
+@contextmanager
+def request_scope():
+    """Check the schema version stamp at most once inside this block (one request)."""
+    token = _checked_versions.set({})
+    try:
+        yield
+    finally:
+        _checked_versions.reset(token)
+
+
+class SchemaRegistry:
+    """
+    Process-wide cache of the employee table columns.
+
+    The layout is read with a single PRAGMA table_info and reused until
+    SQLite's schema version stamp changes, so schema edits made by another
+    worker process are picked up on the next lookup. In JSON storage mode
+    the stamp also carries the field definition counter, so fields added,
+    renamed or dropped without DDL are picked up the same way.
+
+    Within a request the stamp is read once: later lookups reuse it until
+    schema_changed invalidates the registry. Outside requests (commands,
+    background jobs) every lookup checks it.
+    """
+
+    def __init__(self, table=TABLE_NAME):
+        self.table = table
+        self._lock = threading.Lock()
+        self._version = None
+        self._storage = 'columns'
+        self._columns = ()
+        self._by_name = {}
+        self._indexes = ()
+
+    def _schema_version(self, cursor):
+        if self._storage == 'json':
+            try:
+                cursor.execute(
+                    f"SELECT (SELECT schema_version FROM pragma_schema_version), "
+                    f"(SELECT version FROM {FIELD_VERSION_TABLE} WHERE id = 1)"
+                )
+                return cursor.fetchone()
+            except OperationalError:
+                pass  # switched back to column storage by another process
+        cursor.execute("PRAGMA schema_version")
+        return cursor.fetchone()[0]
+
+    def _load(self):
+        checked = _checked_versions.get()
+        if checked is not None and self._version is not None and checked.get(self.table) == self._version:
+            return
+        self._refresh()
+        if checked is not None:
+            checked[self.table] = self._version
+
+    def _refresh(self):
+        with connection.cursor() as cursor:
+            version = self._schema_version(cursor)
+            if version == self._version:
+                return
+            with self._lock:
+                cursor.execute(f"PRAGMA table_xinfo({self.table})")
+                table_columns = cursor.fetchall()
+                generated = {row[1] for row in table_columns if row[6] in (2, 3)}
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FIELD_TABLE])
+                json_mode = cursor.fetchone() is not None and any(
+                    row[1] == ATTRIBUTES_COLUMN for row in table_columns
+                )
+                self._storage = 'json' if json_mode else 'columns'
+                # Stamp before reading, so a change made meanwhile shows up as a new version next time.
+                version = self._schema_version(cursor)
+                columns = tuple(
+                    Column(name, sql_type, logical_type(sql_type), bool(notnull), default, bool(pk))
+                    for _cid, name, sql_type, notnull, default, pk, hidden in table_columns
+                    if hidden == 0 and not (json_mode and name == ATTRIBUTES_COLUMN)
+                )
+                if json_mode:
+                    cursor.execute(f"SELECT id, name, field_type FROM {FIELD_TABLE} ORDER BY id")
+                    columns += tuple(
+                        Column(
+                            name, SQL_TYPE_MAPPING.get(field_type, ''), field_type, False, None, False,
+                            f'f{field_id}', name in generated,
+                        )
+                        for field_id, name, field_type in cursor.fetchall()
+                    )
+                cursor.execute(f"PRAGMA index_list({self.table})")
+                indexes = []
+                for _seq, index_name, unique, _origin, partial in cursor.fetchall():
+                    cursor.execute(f"PRAGMA index_info({connection.ops.quote_name(index_name)})")
+                    index_columns = tuple(row[2] for row in cursor.fetchall())
+                    indexes.append(Index(index_name, index_columns, bool(unique), bool(partial)))
+                self._columns = columns
+                self._by_name = {column.name: column for column in columns}
+                self._indexes = tuple(indexes)
+                self._version = version
+
+    def columns(self):
+        self._load()
+        return self._columns
+
+    def names(self):
+        return [column.name for column in self.columns()]
+
+    def get(self, name):
+        self._load()
+        return self._by_name.get(name)
+
+    def lookup(self, names):
+        """Columns for several names (None for unknown ones) with a single freshness check."""
+        self._load()
+        return [self._by_name.get(name) for name in names]
+
+    def column_type(self, name):
+        """Return the declared SQL type of a column, or 'unknown'."""
+        return self.column_types([name])[0]
+
+    def column_types(self, names):
+        """Declared SQL types for several columns with a single freshness check."""
+        self._load()
+        by_name = self._by_name
+        return [by_name[name].sql_type if name in by_name else 'unknown' for name in names]
+
+    def expression(self, name, table=TABLE_NAME):
+        """SQL reading field ``name`` from ``table``: the column itself, or its JSON attribute."""
+        return self.expressions([name], table)[0]
+
+    def expressions(self, names, table=TABLE_NAME):
+        """``expression`` for several fields with a single freshness check."""
+        self._load()
+        qn = connection.ops.quote_name
+        expressions = []
+        for name in names:
+            column = self._by_name.get(name)
+            if column is None or column.json_key is None or column.promoted:
+                expressions.append(f"{table}.{qn(name)}")
+            else:
+                expressions.append(json_value_sql(table, column.json_key))
+        return expressions
+
+    @property
+    def storage(self):
+        """'columns' when every field is a table column, 'json' when dynamic fields live in ATTRIBUTES_COLUMN."""
+        self._load()
+        return self._storage
+
+    def indexes(self):
+        """Indexes on the table (including UNIQUE constraint autoindexes), refreshed with the columns."""
+        self._load()
+        return self._indexes
+
+    @property
+    def version(self):
+        self._load()
+        return self._version
+
+    def recheck(self):
+        """Read the stamp again on the next lookup; for DDL run by this request without schema_changed."""
+        checked = _checked_versions.get()
+        if checked is not None:
+            checked.pop(self.table, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._storage = 'columns'
+            self._columns = ()
+            self._by_name = {}
+            self._indexes = ()
+
+
+registry = SchemaRegistry()
+
+
+@receiver(schema_changed)
+def refresh_registry(sender, **kwargs):
+    registry.invalidate()
+
+
+@receiver(request_started)
+def start_request_scope(sender, **kwargs):
+    _checked_versions.set({})
+
+
+@receiver(request_finished)
+def end_request_scope(sender, **kwargs):
+    _checked_versions.set(None)
@@ -0,0 +1,153 @@
+import logging
+import re
+import threading
+from collections import namedtuple
+
+from django.db import DatabaseError, connection, transaction
+from django.dispatch import receiver
+
+from .schema import ATTRIBUTES_COLUMN, TABLE_NAME, registry as schema_registry, value_sql
+from .signals import schema_changed
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = f'{TABLE_NAME}_fts'
+# Content table of the index in JSON storage mode: the employee table with JSON fields as columns.
+SEARCH_VIEW = f'{TABLE_NAME}_search'
+
+# Logical field types whose values are worth tokenizing.
+TEXT_FIELD_TYPES = {'char', 'text', 'email', 'phone', 'url'}
+
+# ``key`` is the expression pages seek and sort on; it must be equal to the employee id.
+SearchClause = namedtuple('SearchClause', ['from_sql', 'where', 'params', 'order_by', 'key'])
+
+_token_re = re.compile(r'\w+', re.UNICODE)
+
+
+def like_clause(term):
+    """The original substring match on the name column (full table scan)."""
+    return SearchClause(TABLE_NAME, ["LOWER(name) LIKE LOWER(%s)"], [f"%{term}%"], None, 'id')
+
+
+def match_expression(term):
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    return ' '.join(f'"{token}"*' for token in _token_re.findall(term))
+
+
+class SearchIndex:
+    """
+    External-content FTS5 index over the text columns of the employee table.
+
+    Triggers keep the index in step with inserts, updates and deletes. The
+    expected DDL is derived from the schema registry; whenever it differs
+    from what is installed (a text field was added, renamed or dropped) the
+    index is recreated and repopulated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_version = None
+        self._available = None
+
+    @property
+    def available(self):
+        if self._available is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                self._available = bool(cursor.fetchone()[0])
+        return self._available
+
+    def indexed_columns(self):
+        return [column.name for column in schema_registry.columns() if column.field_type in TEXT_FIELD_TYPES]
+
+    def expected_ddl(self):
+        qn = connection.ops.quote_name
+        indexed = [column for column in schema_registry.columns() if column.field_type in TEXT_FIELD_TYPES]
+        columns = [qn(column.name) for column in indexed]
+        column_list = ', '.join(columns)
+        new_values = ', '.join(value_sql(column, 'new') for column in indexed)
+        old_values = ', '.join(value_sql(column, 'old') for column in indexed)
+        fts, table = qn(FTS_TABLE), qn(TABLE_NAME)
+        insert_new = f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values});"
+        delete_old = f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+        ddl = {}
+        content, watched = TABLE_NAME, columns
+        if any(column.json_key for column in indexed):
+            # JSON fields are not columns the index could read its content from; a view exposes them as such.
+            content = SEARCH_VIEW
+            view_values = ', '.join(f"{value_sql(column, table)} AS {qn(column.name)}" for column in indexed)
+            ddl[SEARCH_VIEW] = f"CREATE VIEW {qn(SEARCH_VIEW)} AS SELECT id, {view_values} FROM {table}"
+            watched = [qn(column.name) for column in indexed if not column.json_key] + [qn(ATTRIBUTES_COLUMN)]
+        return {
+            **ddl,
+            FTS_TABLE: (
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, "
+                f"content='{content}', content_rowid='id', prefix='2 3')"
+            ),
+            f'{FTS_TABLE}_ai': f"CREATE TRIGGER {qn(FTS_TABLE + '_ai')} AFTER INSERT ON {table} BEGIN {insert_new} END",
+            f'{FTS_TABLE}_ad': f"CREATE TRIGGER {qn(FTS_TABLE + '_ad')} AFTER DELETE ON {table} BEGIN {delete_old} END",
+            f'{FTS_TABLE}_au': (
+                f"CREATE TRIGGER {qn(FTS_TABLE + '_au')} AFTER UPDATE OF {', '.join(watched)} ON {table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            ),
+        }
+
+    def installed_ddl(self, cursor):
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger', 'view') "
+            "AND name IN (%s, %s, %s, %s, %s)",
+            [SEARCH_VIEW, FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'],
+        )
+        return dict(cursor.fetchall())
+
+    def ensure(self):
+        """Make sure the index matches the current schema. Returns False when FTS5 cannot be used."""
+        if not self.available:
+            return False
+        if self._checked_version == schema_registry.version:
+            return True
+        with self._lock:
+            try:
+                expected = self.expected_ddl()
+                with connection.cursor() as cursor:
+                    if self.installed_ddl(cursor) != expected:
+                        self._install(cursor, expected)
+                        schema_registry.recheck()
+            except DatabaseError as db_error:
+                logger.error("Could not build the employee search index: %s", str(db_error))
+                return False
+            self._checked_version = schema_registry.version
+        return True
+
+    def _install(self, cursor, ddl):
+        qn = connection.ops.quote_name
+        with transaction.atomic():
+            for suffix in ('_ai', '_ad', '_au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {qn(FTS_TABLE + suffix)}")
+            cursor.execute(f"DROP TABLE IF EXISTS {qn(FTS_TABLE)}")
+            cursor.execute(f"DROP VIEW IF EXISTS {qn(SEARCH_VIEW)}")
+            for sql in ddl.values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {qn(FTS_TABLE)}({qn(FTS_TABLE)}) VALUES ('rebuild')")
+        logger.info("Rebuilt employee search index over %s", ', '.join(self.indexed_columns()))
+
+    def clause(self, term):
+        """Restrict the employee table to rows matching ``term``, best matches first."""
+        expression = match_expression(term)
+        if not expression or not self.ensure():
+            return like_clause(term)
+        # Driving the join from the index lets paginated reads walk matches in rowid order and stop early.
+        from_sql = f"{FTS_TABLE} JOIN {TABLE_NAME} ON {TABLE_NAME}.id = {FTS_TABLE}.rowid"
+        return SearchClause(from_sql, [f"{FTS_TABLE} MATCH %s"], [expression], f"{FTS_TABLE}.rank", f"{FTS_TABLE}.rowid")
+
+    def reset(self):
+        self._checked_version = None
+
+
+search_index = SearchIndex()
+
+
+@receiver(schema_changed)
+def rebuild_search_index(sender, **kwargs):
+    # The next search compares the installed DDL with the new schema and rebuilds if needed.
+    search_index.reset()
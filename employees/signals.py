@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent after AddFieldView changes the layout of employees_employee, IndexView
+# its indexes, or the dynamic_field_storage command its storage mode. Receivers
+# get ``operation`` ('add', 'rename', 'drop', 'add_index', 'drop_index' or
+# 'storage') and ``field_name`` (the index name for index operations, None for
+# 'storage'); renames also pass ``old_field_name``.
+schema_changed = Signal()
@@ -0,0 +1,91 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .cache import LRUBackend
+from .schema import registry as schema_registry
+from .signals import schema_changed
+
+DEFAULTS = {
+    'MAX_ENTRIES': 512,
+}
+
+
+class StatementCache:
+    """
+    LRU cache of compiled SQL templates for the write and read builders.
+
+    Keys are the statement kind, its column set, any extra template
+    arguments and the schema version, so an entry is only reused for the
+    layout it was checked against. Write statements are keyed by the
+    sorted column set: the same fields sent in any order share one SQL
+    string, which also keeps sqlite3's own prepared statement cache warm.
+
+    The schema version comes from the registry, which reads SQLite's stamp
+    once per request, so a hit costs no query of its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def options(self):
+        return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_STATEMENT_CACHE', {})}
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = LRUBackend(self.options)
+        return self._entries
+
+    def get(self, kind, names, build, *args):
+        """The template built by ``build(names, *args)``; errors from ``build`` are raised and not cached."""
+        key = (kind, tuple(names), args, schema_registry.version)
+        statement = self.entries.get(key)
+        with self._lock:
+            if statement is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if statement is None:
+            statement = build(list(names), *args)
+            self.entries.set(key, statement)
+        return statement
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': self.entries.size(),
+            'max_entries': self.entries.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset(self):
+        """Forget the entries and the counters (used when settings change)."""
+        self._entries = None
+        self.hits = self.misses = 0
+
+
+statement_cache = StatementCache()
+
+
+@receiver(schema_changed)
+def clear_statements(sender, **kwargs):
+    # Entries of the old schema version can never be hit again; free them now.
+    statement_cache.clear()
+
+
+@receiver(setting_changed)
+def reload_statement_cache_settings(sender, setting, **kwargs):
+    if setting == 'EMPLOYEES_STATEMENT_CACHE':
+        statement_cache.reset()
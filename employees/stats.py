@@ -0,0 +1,268 @@
+import json
+import logging
+import threading
+
+from django.db import OperationalError, connection, transaction
+from django.dispatch import receiver
+
+from .projection import is_heavy
+from .routing import read_connection
+from .schema import TABLE_NAME, registry as schema_registry, value_sql
+from .signals import schema_changed
+
+logger = logging.getLogger(__name__)
+
+# One row: the headcount and, per column, how many rows have a value in it.
+FILLED_TABLE = 'employees_stats_filled'
+# Row count per distinct value of each grouped field.
+VALUE_TABLE = 'employees_stats_value'
+# Fields whose values are counted; kept across rebuilds.
+GROUP_TABLE = 'employees_stats_group'
+TRIGGER_PREFIX = 'employees_stats'
+HEADCOUNT_COLUMN = '__rows'
+
+
+def _literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def filled_sql(expression):
+    """1 when the value is neither NULL nor an empty string, else 0."""
+    return f"({expression} IS NOT NULL AND {expression} != '')"
+
+
+class SummaryTables:
+    """
+    Trigger-maintained aggregates of the employee table for dashboards.
+
+    Inserts, updates and deletes adjust the headcount, the filled count of
+    every column and the per-value counts of the grouped fields in the same
+    transaction, so reading them costs one row plus one row per group. The
+    expected DDL is derived from the schema registry and the grouped fields;
+    whenever it differs from what is installed (a field was added, renamed
+    or dropped, or a DDL change dropped the triggers) the summaries are
+    recreated and recounted from the table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_version = None
+        self._grouped = []
+
+    def _create_group_table(self, cursor):
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(GROUP_TABLE)} (field TEXT PRIMARY KEY)")
+
+    def grouped_fields(self, cursor=None):
+        """Grouped fields that still exist, in the order they were added."""
+        if cursor is None:
+            with connection.cursor() as cursor:
+                return self.grouped_fields(cursor)
+        self._create_group_table(cursor)
+        cursor.execute(f"SELECT field FROM {GROUP_TABLE} ORDER BY rowid")
+        return [name for (name,) in cursor.fetchall() if schema_registry.get(name) is not None]
+
+    @property
+    def grouped(self):
+        """Grouped fields as of the last ensure()."""
+        return tuple(self._grouped)
+
+    def expected_ddl(self, grouped):
+        qn = connection.ops.quote_name
+        columns = schema_registry.columns()
+        filled, values, table = qn(FILLED_TABLE), qn(VALUE_TABLE), qn(TABLE_NAME)
+        counters = [qn(HEADCOUNT_COLUMN)] + [qn(column.name) for column in columns]
+
+        def adjust_filled(sign, row, other=None):
+            assignments = [f"{qn(HEADCOUNT_COLUMN)} = {qn(HEADCOUNT_COLUMN)} {sign} 1"] if other is None else []
+            for column in columns:
+                change = f"{sign} {filled_sql(value_sql(column, row))}"
+                if other is not None:
+                    change += f" - {filled_sql(value_sql(column, other))}"
+                assignments.append(f"{qn(column.name)} = {qn(column.name)} {change}")
+            return f"UPDATE {filled} SET {', '.join(assignments)};"
+
+        def count_value(name, row, changed=''):
+            value = value_sql(schema_registry.get(name), row)
+            return (
+                f"INSERT INTO {values} (field, value, count) SELECT {_literal(name)}, {value}, 1 "
+                f"WHERE {filled_sql(value)}{changed} ON CONFLICT (field, value) DO UPDATE SET count = count + 1;"
+            )
+
+        def uncount_value(name, row, changed=''):
+            value = value_sql(schema_registry.get(name), row)
+            match = f"field = {_literal(name)} AND value = {value}{changed}"
+            return (
+                f"UPDATE {values} SET count = count - 1 WHERE {match}; "
+                f"DELETE FROM {values} WHERE {match} AND count <= 0;"
+            )
+
+        def changed(name):
+            column = schema_registry.get(name)
+            return f" AND {value_sql(column, 'old')} IS NOT {value_sql(column, 'new')}"
+
+        bodies = {
+            'ai': [adjust_filled('+', 'new')] + [count_value(name, 'new') for name in grouped],
+            'ad': [adjust_filled('-', 'old')] + [uncount_value(name, 'old') for name in grouped],
+            'au': [adjust_filled('+', 'new', 'old')] + [
+                statement for name in grouped
+                for statement in (uncount_value(name, 'old', changed(name)), count_value(name, 'new', changed(name)))
+            ],
+        }
+        ddl = {
+            FILLED_TABLE: (
+                f"CREATE TABLE {filled} ({', '.join(f'{counter} INTEGER NOT NULL' for counter in counters)})"
+            ),
+            VALUE_TABLE: (
+                f"CREATE TABLE {values} (field TEXT NOT NULL, value NOT NULL, count INTEGER NOT NULL, "
+                f"PRIMARY KEY (field, value)) WITHOUT ROWID"
+            ),
+        }
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            name = f'{TRIGGER_PREFIX}_{suffix}'
+            ddl[name] = f"CREATE TRIGGER {qn(name)} AFTER {event} ON {table} BEGIN {' '.join(bodies[suffix])} END"
+        return ddl
+
+    def ensure(self):
+        if self._checked_version == schema_registry.version:
+            return
+        with self._lock:
+            with connection.cursor() as cursor:
+                grouped = self.grouped_fields(cursor)
+                expected = self.expected_ddl(grouped)
+                cursor.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * len(expected)),
+                    list(expected),
+                )
+                if dict(cursor.fetchall()) != expected:
+                    self._install(cursor, expected, grouped)
+                    schema_registry.recheck()
+            self._grouped = grouped
+            self._checked_version = schema_registry.version
+
+    def _install(self, cursor, ddl, grouped):
+        qn = connection.ops.quote_name
+        columns = schema_registry.columns()
+        table = qn(TABLE_NAME)
+        with transaction.atomic():
+            for suffix in ('ai', 'au', 'ad'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {qn(f'{TRIGGER_PREFIX}_{suffix}')}")
+            cursor.execute(f"DROP TABLE IF EXISTS {qn(FILLED_TABLE)}")
+            cursor.execute(f"DROP TABLE IF EXISTS {qn(VALUE_TABLE)}")
+            for sql in ddl.values():
+                cursor.execute(sql)
+            # Recount under the same write lock the triggers run in; no write can slip in between.
+            counts = ', '.join(f"COALESCE(SUM({filled_sql(value_sql(column, table))}), 0)" for column in columns)
+            targets = ', '.join(qn(name) for name in [HEADCOUNT_COLUMN] + [column.name for column in columns])
+            cursor.execute(f"INSERT INTO {qn(FILLED_TABLE)} ({targets}) SELECT COUNT(*), {counts} FROM {table}")
+            for name in grouped:
+                value = value_sql(schema_registry.get(name), table)
+                cursor.execute(
+                    f"INSERT INTO {qn(VALUE_TABLE)} (field, value, count) SELECT %s, {value}, COUNT(*) "
+                    f"FROM {table} WHERE {filled_sql(value)} GROUP BY {value}",
+                    [name],
+                )
+        logger.info("Rebuilt employee summary tables (grouped by %s)", ', '.join(grouped) or 'nothing')
+
+    def snapshot(self, group_by=None):
+        """
+        Headcount, filled/empty counts per column and value counts per grouped field.
+
+        ``group_by`` limits the value counts to some of the grouped fields;
+        ValueError is raised for fields that are not grouped.
+        """
+        for attempt in range(2):
+            self.ensure()
+            grouped = self._grouped
+            if group_by is not None:
+                missing = [name for name in group_by if name not in grouped]
+                if missing:
+                    raise ValueError(f"Fields are not grouped: {', '.join(missing)}")
+                grouped = group_by
+            try:
+                return self._read(grouped)
+            except OperationalError:
+                if attempt:
+                    raise
+            # The tables disappeared behind our back (e.g. a rolled back transaction).
+            self.reset()
+
+    def _read(self, grouped):
+        with read_connection().cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {FILLED_TABLE}")
+            names = [description[0] for description in cursor.description]
+            counts = dict(zip(names, cursor.fetchone()))
+            groups = {name: [] for name in grouped}
+            if grouped:
+                cursor.execute(
+                    f"SELECT field, value, count FROM {VALUE_TABLE} WHERE field IN (SELECT value FROM json_each(%s)) "
+                    f"ORDER BY field, count DESC, value",
+                    [json.dumps(grouped)],
+                )
+                for field, value, count in cursor.fetchall():
+                    groups[field].append({'value': value, 'count': count})
+        headcount = counts.pop(HEADCOUNT_COLUMN)
+        return {
+            'headcount': headcount,
+            'fields': {
+                name: {
+                    'filled': filled,
+                    'empty': headcount - filled,
+                    'filled_ratio': round(filled / headcount, 4) if headcount else None,
+                }
+                for name, filled in counts.items()
+            },
+            'groups': groups,
+        }
+
+    def validate_group_field(self, name):
+        column = schema_registry.get(name) if isinstance(name, str) else None
+        if column is None:
+            raise ValueError(f"Unknown field: {name}")
+        if column.pk or is_heavy(column):
+            raise ValueError(f"Field '{name}' cannot be grouped")
+
+    def add_group(self, name):
+        """Start counting the values of ``name``; returns False when it already is grouped."""
+        self.validate_group_field(name)
+        with connection.cursor() as cursor:
+            self._create_group_table(cursor)
+            cursor.execute(f"INSERT OR IGNORE INTO {GROUP_TABLE} (field) VALUES (%s)", [name])
+            added = cursor.rowcount == 1
+        self.reset()
+        self.ensure()
+        return added
+
+    def _has_group_table(self, cursor):
+        # Checked rather than created, so schema changes that never used the stats stay DDL-free.
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [GROUP_TABLE])
+        return cursor.fetchone() is not None
+
+    def remove_group(self, name):
+        with connection.cursor() as cursor:
+            if not self._has_group_table(cursor):
+                return False
+            cursor.execute(f"DELETE FROM {GROUP_TABLE} WHERE field = %s", [name])
+            removed = cursor.rowcount == 1
+        self.reset()
+        return removed
+
+    def rename_group(self, old_name, new_name):
+        with connection.cursor() as cursor:
+            if self._has_group_table(cursor):
+                cursor.execute(f"UPDATE {GROUP_TABLE} SET field = %s WHERE field = %s", [new_name, old_name])
+
+    def reset(self):
+        self._checked_version = None
+
+
+summary_tables = SummaryTables()
+
+
+@receiver(schema_changed)
+def rebuild_summary_tables(sender, operation=None, field_name=None, old_field_name=None, **kwargs):
+    # Keep grouped fields across renames and forget dropped ones; the next read rebuilds what changed.
+    if operation == 'rename' and old_field_name:
+        summary_tables.rename_group(old_field_name, field_name)
+    elif operation == 'drop':
+        summary_tables.remove_group(field_name)
+    summary_tables.reset()
@@ -0,0 +1,294 @@
+import json
+import re
+import time
+from collections import namedtuple
+
+from django.db import connection, transaction
+
+from .ddl import dependent_objects, drop_column, references_column
+from .models import Employee
+from .schema import (
+    ATTRIBUTES_COLUMN, FIELD_TABLE, FIELD_VERSION_TABLE, TABLE_NAME, json_path, json_value_sql, registry as schema_registry,
+)
+from .search import SEARCH_VIEW
+from .statements import statement_cache
+
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Logical types whose declared SQL type gives the column NUMERIC or TEXT affinity.
+NUMERIC_TYPES = {'number', 'date', 'checkbox'}
+TEXT_TYPES = {'char', 'text', 'email', 'phone', 'url'}
+
+
+def model_columns():
+    """Columns owned by the Employee model and its migrations; always stored as table columns."""
+    return {field.column for field in Employee._meta.concrete_fields}
+
+
+def metadata_ddl():
+    qn = connection.ops.quote_name
+    fields, counter = qn(FIELD_TABLE), qn(FIELD_VERSION_TABLE)
+    bump = f"UPDATE {counter} SET version = version + 1 WHERE id = 1;"
+    ddl = [
+        f"CREATE TABLE {fields} (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE, "
+        f"field_type TEXT NOT NULL)",
+        f"CREATE TABLE {counter} (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        f"INSERT INTO {counter} (id, version) VALUES (1, 0)",
+    ]
+    for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+        ddl.append(f"CREATE TRIGGER {qn(f'{FIELD_TABLE}_{suffix}')} AFTER {event} ON {fields} BEGIN {bump} END")
+    return ddl
+
+
+def stored_value(column, value):
+    """
+    Convert ``value`` the way the column's type affinity would, before it goes into the JSON column.
+
+    SQLite turns '30' into 30 when it is written to an INTEGER column; JSON
+    attributes get the same treatment so reads and filters behave alike in
+    both storage modes.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if column.field_type in NUMERIC_TYPES and isinstance(value, str):
+        for convert in (int, float):
+            try:
+                return convert(value.strip())
+            except ValueError:
+                pass
+    if column.field_type in TEXT_TYPES and isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+class Statement(namedtuple('Statement', ['sql', 'names', 'adapters'])):
+    """A write statement with one placeholder per field in ``names``, in that order."""
+
+    def params(self, values):
+        return [adapt(values[name]) for name, adapt in zip(self.names, self.adapters)]
+
+
+def _write_columns(names):
+    """Split ``names`` into table columns and JSON fields; raises ValueError on unknown names."""
+    columns = schema_registry.lookup(names)
+    unknown = [name for name, column in zip(names, columns) if column is None]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    table = [column for column in columns if column.json_key is None]
+    attributes = [column for column in columns if column.json_key is not None]
+    return table, attributes
+
+
+def _as_is(value):
+    return value
+
+
+def _adapter(column):
+    return lambda value: stored_value(column, value)
+
+
+def insert_statement(names):
+    """INSERT of one employee with the given fields, from the statement cache; raises ValueError on unknown fields."""
+    return statement_cache.get('insert', sorted(names), build_insert)
+
+
+def update_statement(names, where):
+    """UPDATE setting the given fields on the rows matching ``where``, from the statement cache."""
+    return statement_cache.get('update', sorted(names), build_update, where)
+
+
+def build_insert(names):
+    """INSERT of one employee with the given fields, whichever way each one is stored."""
+    qn = connection.ops.quote_name
+    table, attributes = _write_columns(names)
+    targets = [qn(column.name) for column in table]
+    values = ['%s'] * len(table)
+    if attributes:
+        targets.append(qn(ATTRIBUTES_COLUMN))
+        pairs = ', '.join(f"'{column.json_key}', %s" for column in attributes)
+        values.append(f"json_object({pairs})")
+    sql = f"INSERT INTO {TABLE_NAME} ({', '.join(targets)}) VALUES ({', '.join(values)})"
+    ordered = table + attributes
+    return Statement(sql, [column.name for column in ordered], [_as_is] * len(table) + [
+        _adapter(column) for column in attributes
+    ])
+
+
+def build_update(names, where):
+    """UPDATE setting the given fields on the rows matching ``where``; its parameters follow the statement's."""
+    qn = connection.ops.quote_name
+    table, attributes = _write_columns(names)
+    assignments = [f"{qn(column.name)} = %s" for column in table]
+    if attributes:
+        paths = ', '.join(f"{json_path(column.json_key)}, %s" for column in attributes)
+        attributes_column = qn(ATTRIBUTES_COLUMN)
+        assignments.append(f"{attributes_column} = json_set(COALESCE({attributes_column}, '{{}}'), {paths})")
+    sql = f"UPDATE {TABLE_NAME} SET {', '.join(assignments)} WHERE {where}"
+    ordered = table + attributes
+    return Statement(sql, [column.name for column in ordered], [_as_is] * len(table) + [
+        _adapter(column) for column in attributes
+    ])
+
+
+def validate_field_name(name):
+    if not isinstance(name, str) or not FIELD_NAME.match(name) or name == ATTRIBUTES_COLUMN:
+        raise ValueError(f"Invalid field name: {name}")
+    if schema_registry.get(name) is not None:
+        raise ValueError(f"Field '{name}' already exists")
+
+
+def add_field(name, field_type):
+    """Define a JSON field; no DDL, so no table lock and no rewrite."""
+    validate_field_name(name)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FIELD_TABLE} (name, field_type) VALUES (%s, %s)", [name, field_type])
+
+
+def rename_field(old_name, new_name):
+    """Rename a JSON field. Its data is keyed by the field id, so rows are not touched."""
+    validate_field_name(new_name)
+    column = schema_registry.get(old_name)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {FIELD_TABLE} SET name = %s WHERE name = %s", [new_name, old_name])
+        if column.promoted:
+            qn = connection.ops.quote_name
+            cursor.execute(f"ALTER TABLE {qn(TABLE_NAME)} RENAME COLUMN {qn(old_name)} TO {qn(new_name)}")
+
+
+def drop_field(name):
+    """
+    Forget a JSON field. Its values stay in the rows until ``compact`` runs,
+    but are unreachable: a field added later under the same name gets a new key.
+    """
+    column = schema_registry.get(name)
+    started = time.perf_counter()
+    with transaction.atomic():
+        if column.promoted:
+            drop_column(TABLE_NAME, name)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FIELD_TABLE} WHERE name = %s", [name])
+    return {
+        'strategy': 'metadata',
+        'rows': 0,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def promote(name):
+    """
+    Add a VIRTUAL generated column reading the JSON field ``name`` so it can be indexed.
+
+    Adding a virtual column only edits the table definition; the values are
+    computed on read (and once per row when an index is built over it).
+    """
+    column = schema_registry.get(name)
+    if column is None or column.json_key is None or column.promoted:
+        return False
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE_NAME)} ADD COLUMN {qn(name)} {column.sql_type} "
+            f"GENERATED ALWAYS AS (json_extract({qn(ATTRIBUTES_COLUMN)}, {json_path(column.json_key)})) VIRTUAL"
+        )
+    return True
+
+
+def _index_sql(cursor, names):
+    """CREATE INDEX statements of indexes that use any of ``names``."""
+    statements = []
+    for name in names:
+        for kind, _object_name, sql, depends in dependent_objects(cursor, TABLE_NAME, name):
+            if kind == 'index' and depends and sql not in statements:
+                statements.append(sql)
+    return statements
+
+
+def convert_to_json():
+    """
+    Move every dynamic column into the JSON attributes column and define it in FIELD_TABLE.
+
+    Indexed fields are promoted to generated columns and their indexes
+    recreated under the same names. Runs in one transaction.
+    """
+    if schema_registry.storage == 'json':
+        raise ValueError("Dynamic fields are already stored as JSON")
+    qn = connection.ops.quote_name
+    fixed = model_columns()
+    fields = [column for column in schema_registry.columns() if column.name not in fixed]
+    if schema_registry.get(ATTRIBUTES_COLUMN) is not None:
+        raise ValueError(f"The table already has a column named '{ATTRIBUTES_COLUMN}'")
+    with transaction.atomic(), connection.cursor() as cursor:
+        indexes = _index_sql(cursor, [column.name for column in fields])
+        cursor.execute(f"DROP VIEW IF EXISTS {qn(SEARCH_VIEW)}")
+        for sql in metadata_ddl():
+            cursor.execute(sql)
+        cursor.execute(f"ALTER TABLE {qn(TABLE_NAME)} ADD COLUMN {qn(ATTRIBUTES_COLUMN)} TEXT")
+        keys = []
+        for column in fields:
+            cursor.execute(
+                f"INSERT INTO {FIELD_TABLE} (name, field_type) VALUES (%s, %s)", [column.name, column.field_type]
+            )
+            keys.append(f'f{cursor.lastrowid}')
+        if fields:
+            pairs = ', '.join(f"'{key}', {qn(column.name)}" for key, column in zip(keys, fields))
+            cursor.execute(f"UPDATE {qn(TABLE_NAME)} SET {qn(ATTRIBUTES_COLUMN)} = json_object({pairs})")
+        for column in fields:
+            drop_column(TABLE_NAME, column.name)
+        schema_registry.invalidate()
+        for column in fields:
+            if any(references_column(sql, column.name) for sql in indexes):
+                promote(column.name)
+        for sql in indexes:
+            cursor.execute(sql)
+    schema_registry.invalidate()
+    return {'storage': 'json', 'fields': len(fields), 'indexes': len(indexes)}
+
+
+def convert_to_columns():
+    """Turn every JSON field back into a table column (keeping indexes) and drop the JSON storage."""
+    if schema_registry.storage != 'json':
+        raise ValueError("Dynamic fields are already stored as columns")
+    qn = connection.ops.quote_name
+    fields = [column for column in schema_registry.columns() if column.json_key is not None]
+    with transaction.atomic(), connection.cursor() as cursor:
+        indexes = _index_sql(cursor, [column.name for column in fields if column.promoted])
+        # The search index reads JSON fields through this view; it is rebuilt over the new columns on next use.
+        cursor.execute(f"DROP VIEW IF EXISTS {qn(SEARCH_VIEW)}")
+        for column in fields:
+            if column.promoted:
+                drop_column(TABLE_NAME, column.name)
+        for column in fields:
+            cursor.execute(f"ALTER TABLE {qn(TABLE_NAME)} ADD COLUMN {qn(column.name)} {column.sql_type}")
+        if fields:
+            assignments = ', '.join(
+                f"{qn(column.name)} = {json_value_sql(qn(TABLE_NAME), column.json_key)}" for column in fields
+            )
+            cursor.execute(f"UPDATE {qn(TABLE_NAME)} SET {assignments}")
+        drop_column(TABLE_NAME, ATTRIBUTES_COLUMN)
+        cursor.execute(f"DROP TABLE {qn(FIELD_TABLE)}")
+        cursor.execute(f"DROP TABLE {qn(FIELD_VERSION_TABLE)}")
+        for sql in indexes:
+            cursor.execute(sql)
+    schema_registry.invalidate()
+    return {'storage': 'columns', 'fields': len(fields), 'indexes': len(indexes)}
+
+
+def compact():
+    """Remove the values of dropped JSON fields from every row; returns the number of rows rewritten."""
+    if schema_registry.storage != 'json':
+        raise ValueError("Dynamic fields are stored as columns")
+    qn = connection.ops.quote_name
+    live = {column.json_key for column in schema_registry.columns() if column.json_key is not None}
+    table, attributes = qn(TABLE_NAME), qn(ATTRIBUTES_COLUMN)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT DISTINCT key FROM {table}, json_each({table}.{attributes})")
+        dropped = sorted(key for (key,) in cursor.fetchall() if key not in live)
+        if not dropped:
+            return 0
+        paths = ', '.join(json_path(key) for key in dropped)
+        cursor.execute(
+            f"UPDATE {table} SET {attributes} = json_remove({attributes}, {paths}) "
+            f"WHERE EXISTS (SELECT 1 FROM json_each({attributes}) WHERE key IN (SELECT value FROM json_each(%s)))",
+            [json.dumps(dropped)],
+        )
+        return cursor.rowcount
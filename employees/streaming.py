@@ -0,0 +1,123 @@
+import base64
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .pagination import encode_cursor
+from .routing import read_connection
+
+FETCH_SIZE = 500
+
+_encoder = JSONEncoder(separators=(',', ':'))
+
+
+def iter_rows(query, params, fetch_size=FETCH_SIZE):
+    """
+    Yield the cursor description once, then the result rows in fetchmany batches.
+
+    The cursor stays open for the life of the generator, so callers must
+    exhaust (or close) it before the request finishes. The connection is
+    picked on first iteration, on the thread that consumes the generator.
+    """
+    with read_connection().cursor() as cursor:
+        cursor.execute(query, params)
+        yield cursor.description
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def stream_employee_list(query, params, column_types, page, fetch_size=FETCH_SIZE):
+    """
+    Stream the same document as the list endpoint chunk by chunk, including
+    ``next`` only when the request is paginated.
+
+    ``column_types`` is a callable taking the column names, and ``page`` is the
+    KeysetPage already applied to ``query``; its look-ahead row is never written.
+    """
+    def generate():
+        batches = iter_rows(query, params, fetch_size)
+        columns = [col[0] for col in next(batches)]
+        id_index = columns.index('id')
+        yield (
+            '{"columns":' + _encoder.encode(columns)
+            + ',"column_types":' + _encoder.encode(column_types(columns))
+            + ',"data":['
+        )
+        remaining = page.limit
+        written = 0
+        last_id = None
+        has_more = False
+        for rows in batches:
+            if remaining is not None:
+                if len(rows) > remaining:
+                    has_more = True
+                    rows = rows[:remaining]
+                remaining -= len(rows)
+            if rows:
+                chunk = ','.join(_encoder.encode(dict(zip(columns, row))) for row in rows)
+                yield (',' if written else '') + chunk
+                written += len(rows)
+                last_id = rows[-1][id_index]
+            if has_more:
+                batches.close()
+                break
+        if not page.enabled:
+            yield ']}'
+            return
+        next_cursor = encode_cursor(last_id) if has_more else None
+        yield '],"next":' + json.dumps(next_cursor) + '}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_value(value):
+    # Dynamic BLOB columns usually hold file paths, but real bytes must survive CSV and JSON.
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return value
+
+
+class _LineBuffer:
+    """Write target for csv.writer that hands back what was written instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(batches):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow([col[0] for col in next(batches)])
+    for rows in batches:
+        yield ''.join(writer.writerow([export_value(value) for value in row]) for row in rows)
+
+
+def iter_ndjson(batches):
+    columns = [col[0] for col in next(batches)]
+    for rows in batches:
+        yield ''.join(
+            _encoder.encode(dict(zip(columns, (export_value(value) for value in row)))) + '\n' for row in rows
+        )
+
+
+def stream_export(query, params, export_format, filename='employees', fetch_size=FETCH_SIZE):
+    """
+    Stream the rows of ``query`` as CSV (with a header row) or NDJSON.
+
+    One fetchmany batch is encoded per chunk, so memory use depends on
+    ``fetch_size`` and not on the number of rows.
+    """
+    encode = iter_csv if export_format == 'csv' else iter_ndjson
+    response = StreamingHttpResponse(encode(iter_rows(query, params, fetch_size)), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
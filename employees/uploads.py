@@ -0,0 +1,92 @@
+import hashlib
+from pathlib import Path
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+UPLOAD_DIR = 'uploads'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+    """MemoryFileUploadHandler that also records the SHA-256 of small uploads as they arrive."""
+
+    def new_file(self, *args, **kwargs):
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Only hash when this handler keeps the data; large files fall through to the next handler.
+        if self.activated:
+            self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        if upload is not None:
+            upload.sha256 = self.digest.hexdigest()
+        return upload
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler that hashes each chunk on its way to the temporary file."""
+
+    def new_file(self, *args, **kwargs):
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.digest.hexdigest()
+        return upload
+
+
+def is_upload(value):
+    return isinstance(value, UploadedFile)
+
+
+def content_digest(upload):
+    """SHA-256 of ``upload``, taken from the upload handlers when they already computed it."""
+    digest = getattr(upload, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in upload.chunks(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        upload.seek(0)
+    return digest
+
+
+def content_path(digest, filename):
+    """Storage name for content with ``digest``; the original extension is kept so the file serves with the right type."""
+    suffix = Path(filename or '').suffix.lower()[:16]
+    return f'{UPLOAD_DIR}/{digest[:2]}/{digest}{suffix}'
+
+
+def store_upload(upload, storage=None):
+    """
+    Save ``upload`` under its content hash and return the storage name.
+
+    Identical content is stored once: when the name already exists the
+    upload is discarded. Uploads Django spooled to a temporary file are
+    moved into place by FileSystemStorage rather than copied.
+    """
+    storage = storage or default_storage
+    name = content_path(content_digest(upload), upload.name)
+    if storage.exists(name):
+        return name
+    saved = storage.save(name, upload)
+    if saved != name:
+        # Another request stored the same content in the meantime.
+        storage.delete(saved)
+    return name
+
+
+def store_uploads(uploads):
+    """Store every upload in ``{column: upload}``; returns ``{column: storage name}``."""
+    return {column: store_upload(upload) for column, upload in uploads.items()}
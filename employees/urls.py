@@ -1,11 +1,28 @@
 # yourapp/urls.py
 from django.urls import path
-from .views import EmployeeView, AddFieldView,EmployeeDetailView
+from .views import (
+    EmployeeView, AddFieldView,EmployeeDetailView, EmployeeImportView, EmployeeExportView, EmployeeBulkView,
+    SchemaJobView, ResponseCacheStatsView, RequestStatsView, IndexView, QueryPlanView,
+    EmployeeStatsView, StatsGroupView, EmployeeChangesView, StatementCacheStatsView, GroupCommitStatsView,
+)
 
 urlpatterns = [
     path('employees/', EmployeeView.as_view(), name='employee'),
     path('employees/add-field/', AddFieldView.as_view(), name='add-field'),
     path('employees/search/', EmployeeView.as_view(), name='employee-search'), 
+    path('employees/import/', EmployeeImportView.as_view(), name='employee-import'),
+    path('employees/export/', EmployeeExportView.as_view(), name='employee-export'),
+    path('employees/bulk/', EmployeeBulkView.as_view(), name='employee-bulk'),
     path('employees/<int:pk>/', EmployeeDetailView.as_view(), name='employee-detail'),
     path('employees/edit-field/', AddFieldView.as_view(), name='edit-field'),
+    path('employees/indexes/', IndexView.as_view(), name='employee-indexes'),
+    path('employees/query-plan/', QueryPlanView.as_view(), name='employee-query-plan'),
+    path('employees/changes/', EmployeeChangesView.as_view(), name='employee-changes'),
+    path('employees/stats/', EmployeeStatsView.as_view(), name='employee-stats'),
+    path('employees/stats/groups/', StatsGroupView.as_view(), name='employee-stats-groups'),
+    path('employees/schema-jobs/<str:job_id>/', SchemaJobView.as_view(), name='schema-job'),
+    path('employees/cache-stats/', ResponseCacheStatsView.as_view(), name='employee-cache-stats'),
+    path('employees/statement-cache-stats/', StatementCacheStatsView.as_view(), name='employee-statement-cache-stats'),
+    path('employees/group-commit-stats/', GroupCommitStatsView.as_view(), name='employee-group-commit-stats'),
+    path('employees/request-stats/', RequestStatsView.as_view(), name='employee-request-stats'),
 ]
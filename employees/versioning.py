@@ -0,0 +1,113 @@
+import hashlib
+import threading
+
+from django.db import OperationalError, connection, transaction
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .schema import TABLE_NAME, registry as schema_registry
+from .signals import schema_changed
+
+VERSION_TABLE = 'employees_table_version'
+
+
+class TableVersion:
+    """
+    Monotonic change counter for the employee table.
+
+    Row triggers bump the counter on every insert, update and delete, so
+    writes from any code path (bulk endpoints, imports, the Django admin,
+    other processes) are seen. Combined with SQLite's schema version it
+    identifies the exact state a response was built from.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_version = None
+
+    def expected_ddl(self):
+        qn = connection.ops.quote_name
+        table, counter = qn(TABLE_NAME), qn(VERSION_TABLE)
+        bump = f"UPDATE {counter} SET version = version + 1 WHERE id = 1;"
+        ddl = {
+            VERSION_TABLE: (
+                f"CREATE TABLE {counter} (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+            ),
+        }
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            name = f'{VERSION_TABLE}_{suffix}'
+            ddl[name] = f"CREATE TRIGGER {qn(name)} AFTER {event} ON {table} BEGIN {bump} END"
+        return ddl
+
+    def ensure(self):
+        if self._checked_version == schema_registry.version:
+            return
+        with self._lock:
+            expected = self.expected_ddl()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * len(expected)),
+                    list(expected),
+                )
+                installed = dict(cursor.fetchall())
+                if installed != expected:
+                    qn = connection.ops.quote_name
+                    with transaction.atomic():
+                        for name, sql in expected.items():
+                            if installed.get(name) == sql or (name == VERSION_TABLE and name in installed):
+                                continue
+                            if name in installed:
+                                cursor.execute(f"DROP TRIGGER {qn(name)}")
+                            cursor.execute(sql)
+                    schema_registry.recheck()
+                cursor.execute(f"INSERT OR IGNORE INTO {VERSION_TABLE} (id, version) VALUES (1, 0)")
+            self._checked_version = schema_registry.version
+
+    def current(self):
+        """The counter value; read it before the data it describes."""
+        for attempt in range(2):
+            self.ensure()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT version FROM {VERSION_TABLE} WHERE id = 1")
+                    row = cursor.fetchone()
+                if row is not None:
+                    return row[0]
+            except OperationalError:
+                if attempt:
+                    raise
+            # The table or its row disappeared behind our back (e.g. a rolled back transaction).
+            self.reset()
+        raise OperationalError(f"{VERSION_TABLE} has no counter row")
+
+    def reset(self):
+        self._checked_version = None
+
+
+table_version = TableVersion()
+
+
+def not_modified(request, etag):
+    """A 304 response when the client's If-None-Match already has ``etag``, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+def with_etag(response, etag):
+    response['ETag'] = etag
+    # Let clients keep the body but revalidate on every use.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def employee_etag(request, *extra):
+    """Strong ETag for an employee read: table version, schema version and the query parameters."""
+    key = repr((table_version.current(), schema_registry.version, sorted(request.GET.lists()), extra))
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+@receiver(schema_changed)
+def recheck_version_triggers(sender, **kwargs):
+    table_version.reset()
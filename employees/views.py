@@ -1,12 +1,42 @@
 from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from django.core.files.storage import default_storage
-from django.db import DatabaseError
-from .models import Employee
+from django.db import DatabaseError, IntegrityError, transaction
+from .cache import response_cache
+from .changes import ResyncRequired, change_feed
+from .ddl import drop_column
+from .filters import check_scalars, filter_clause, parse_filters, selection_clause
+from .indexes import (
+    create_index, describe, drop_index, find_index, index_name, plan_report, validate_index_fields,
+)
+from .importers import (
+    DEFAULT_BATCH_SIZE, IMPORT_FORMATS, MAX_BATCH_SIZE, BulkImporter, ImportFormatError, iter_lines, read_csv,
+    read_ndjson,
+)
+from .instrumentation import endpoint_stats
+from .jobs import JobConflict, schema_jobs
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, KeysetPage
+from .projection import default_fields, detail_query, requested_fields, select_list
+from .routing import read_connection
+from .schema import SQL_TYPE_MAPPING, TABLE_NAME, registry as schema_registry
+from .search import SearchClause, search_index
+from .signals import schema_changed
+from .statements import statement_cache
+from .stats import summary_tables
+from .storage import (
+    add_field as add_json_field, drop_field as drop_json_field, insert_statement, rename_field as rename_json_field,
+    update_statement,
+)
+from .streaming import EXPORT_FORMATS, stream_employee_list, stream_export
+from .uploads import is_upload, store_uploads
+from .versioning import employee_etag, not_modified, with_etag
+from .writes import group_commit
 import logging
 from pathlib import Path
 
@@ -16,15 +46,12 @@ def delete_file_if_exists(file_path):
     if file_path and Path(file_path).exists():
         Path(file_path).unlink()
 
+def is_truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
 # Helper function to fetch column type
 def get_column_type(column_name):
-    with connection.cursor() as cursor:
-        cursor.execute("PRAGMA table_info(employees_employee)")  # Update table name if different
-        columns_info = cursor.fetchall()
-        for column in columns_info:
-            if column[1] == column_name:
-                return column[2]
-    return 'unknown'
+    return schema_registry.column_type(column_name)
 
 
 # Helper function for deleting old files
@@ -33,32 +60,72 @@ def delete_file_if_exists(file_path):
         default_storage.delete(file_path)
 
 
+def list_query(search_query, page, fields, filters):
+    """SQL and parameters for a list read; shared by the list endpoint and the query plan report."""
+    filter_where, filter_params = filter_clause(filters)
+    if search_query:
+        clause = search_index.clause(search_query)
+    else:
+        # No INDEXED BY: an index is ordered by its columns, so reading rows in id order through one
+        # needs a temporary sort, and the planner already picks an index when a filter can use it.
+        clause = SearchClause(TABLE_NAME, [], [], None, 'id')
+    return page.apply(
+        f"SELECT {select_list(fields)} FROM {clause.from_sql}",
+        clause.where + filter_where, clause.params + filter_params, clause.order_by, clause.key,
+    )
+
+
 class EmployeeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        """Retrieve all employees or filter by a search query."""
+        """
+        Retrieve employees, optionally filtered by a search query and typed field filters
+        (``?age__gte=30``), paginated by id and limited to ``?fields=``.
+        """
         search_query = request.GET.get('search', None)
-        with connection.cursor() as cursor:
-            if search_query:
-                query = """
-                    SELECT * FROM employees_employee 
-                    WHERE LOWER(name) LIKE LOWER(%s)
-                """
-                cursor.execute(query, [f"%{search_query}%"])
-            else:
-                cursor.execute("SELECT * FROM employees_employee")
-
-            columns = [col[0] for col in cursor.description]
+        try:
+            page = KeysetPage.from_request(request)
+            fields = requested_fields(request.GET.get('fields'))
+            filters = parse_filters(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = employee_etag(request)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        query, params = list_query(search_query, page, fields, filters)
+
+        if is_truthy(request.GET.get('stream')):
+            return with_etag(stream_employee_list(query, params, schema_registry.column_types, page), etag)
+
+        use_cache = response_cache.enabled and request.accepted_renderer.format == 'json'
+        if use_cache:
+            body = response_cache.get(etag)
+            if body is not None:
+                return with_etag(HttpResponse(body, content_type='application/json'), etag)
+
+        with read_connection().cursor() as cursor:
+            cursor.execute(query, params)
             rows = cursor.fetchall()
+        columns = fields
 
+        rows, next_cursor = page.next_cursor(rows, columns.index('id'))
         data = [dict(zip(columns, row)) for row in rows]
         response_data = {
             'columns': columns,
-            'column_types': [get_column_type(col) for col in columns],
+            'column_types': schema_registry.column_types(columns),
             'data': data,
         }
-        return Response(response_data, status=status.HTTP_200_OK)
+        if page.enabled:
+            response_data['next'] = next_cursor
+        if use_cache:
+            body = JSONRenderer().render(response_data)
+            response_cache.set(etag, body)
+            return with_etag(HttpResponse(body, content_type='application/json'), etag)
+        return with_etag(Response(response_data, status=status.HTTP_200_OK), etag)
 
     def post(self, request):
         """Create a new employee entry with support for file uploads."""
@@ -66,7 +133,7 @@ class EmployeeView(APIView):
         file_fields = {}
 
         for key, value in request.data.items():
-            if isinstance(value, InMemoryUploadedFile):
+            if is_upload(value):
                 file_fields[key] = value
             else:
                 employee_data[key] = value
@@ -75,25 +142,26 @@ class EmployeeView(APIView):
         if not employee_data:
             return Response({"error": "No valid data provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        columns = ', '.join(employee_data.keys())
-        values_placeholder = ', '.join(['%s'] * len(employee_data))
-        query = f"INSERT INTO employees_employee ({columns}) VALUES ({values_placeholder})"
+        try:
+            # Checked before any file is written, so a rejected request leaves nothing in MEDIA_ROOT.
+            statement = insert_statement(list(employee_data) + list(file_fields))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(query, list(employee_data.values()))
-                employee_id = cursor.lastrowid
-
-                if not employee_id:
-                    return Response({"error": "Failed to retrieve employee ID"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-                for file_field, file in file_fields.items():
-                    file_path = default_storage.save(f'{file_field}s/{file.name}', file)
-                    cursor.execute(
-                        f"UPDATE employees_employee SET {file_field} = %s WHERE id = %s",
-                        [file_path, employee_id]
-                    )
-    
+            # Files are stored before the INSERT so their paths go into it.
+            employee_data.update(store_uploads(file_fields))
+        except OSError as e:
+            logger.error("Error storing uploaded files: %s", str(e))
+            return Response({"error": "Could not store uploaded files"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        try:
+            employee_id = group_commit.execute(statement.sql, statement.params(employee_data)).lastrowid
+
+            if not employee_id:
+                return Response({"error": "Failed to retrieve employee ID"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+            response_cache.invalidate()
             return Response({"message": "Employee created successfully"}, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -101,18 +169,7 @@ class EmployeeView(APIView):
 
 class AddFieldView(APIView):
     permission_classes = [IsAuthenticated]
-    sql_type_mapping = {
-        'char': 'VARCHAR(150)',
-        'text': 'VARCHAR(300)',
-        'number': 'INTEGER',
-        'date': 'DATE',
-        'email': 'VARCHAR(254)',
-        'phone': 'VARCHAR(20)',
-        'url': 'VARCHAR(720)',
-        'checkbox': 'BOOLEAN',
-        'image': 'BLOB',
-        'file.txt': 'BLOB',
-    }
+    sql_type_mapping = SQL_TYPE_MAPPING
 
     def post(self, request):
         """Add a new column to the Employee table."""
@@ -122,11 +179,20 @@ class AddFieldView(APIView):
         if not field_name or not field_type or field_type not in self.sql_type_mapping:
             return Response({"error": "Invalid field name or type"}, status=status.HTTP_400_BAD_REQUEST)
 
+        if schema_registry.storage == 'json':
+            try:
+                add_json_field(field_name, field_type)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            schema_changed.send(sender=self.__class__, operation='add', field_name=field_name)
+            return Response({"message": f"Field '{field_name}' added successfully"}, status=status.HTTP_201_CREATED)
+
         sql = f"ALTER TABLE employees_employee ADD COLUMN {field_name} {self.sql_type_mapping[field_type]}"
         
         try:
             with connection.cursor() as cursor:
                 cursor.execute(sql)
+            schema_changed.send(sender=self.__class__, operation='add', field_name=field_name)
             return Response({"message": f"Field '{field_name}' added successfully"}, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -139,98 +205,341 @@ class AddFieldView(APIView):
         if not old_field_name or not new_field_name:
             return Response({"error": "Both old and new field names are required"}, status=status.HTTP_400_BAD_REQUEST)
 
+        column = schema_registry.get(old_field_name)
+        if column is not None and column.json_key is not None:
+            try:
+                rename_json_field(old_field_name, new_field_name)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            schema_changed.send(
+                sender=self.__class__, operation='rename', field_name=new_field_name, old_field_name=old_field_name
+            )
+            return Response({"message": f"Field '{old_field_name}' renamed successfully"}, status=status.HTTP_200_OK)
+
         sql = f"ALTER TABLE employees_employee RENAME COLUMN {old_field_name} TO {new_field_name}"
         
         try:
             with connection.cursor() as cursor:
                 cursor.execute(sql)
+            schema_changed.send(
+                sender=self.__class__, operation='rename', field_name=new_field_name, old_field_name=old_field_name
+            )
             return Response({"message": f"Field '{old_field_name}' renamed successfully"}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def delete(self, request):
-        """Delete a column from the Employee table."""
+        """Delete a column from the Employee table, optionally as a background schema job."""
         field_name = request.data.get('field_name')
 
         if not field_name:
             return Response({"error": "Field name is required"}, status=status.HTTP_400_BAD_REQUEST)
+        column = schema_registry.get(field_name)
+        if column is None:
+            return Response({"error": f"Field '{field_name}' not found"}, status=status.HTTP_404_NOT_FOUND)
+        if column.pk:
+            return Response({"error": "The primary key cannot be deleted"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_truthy(request.data.get('async', request.GET.get('async'))):
+            try:
+                # Online: the rebuild commits chunk by chunk, so API writes keep going meanwhile.
+                job = schema_jobs.submit(
+                    'drop', field_name, lambda progress: self.drop_field(field_name, progress, online=True),
+                )
+            except JobConflict as running:
+                return Response(
+                    {"error": "Another schema change is in progress", "job_id": str(running)},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return Response(
+                {"job": job.as_dict(), "status_url": reverse('schema-job', args=[job.id])},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         try:
-            cursor = connection.cursor()
-            cursor.execute("PRAGMA table_info(employees_employee)")
-            columns = [column[1] for column in cursor.fetchall()]
+            result = self.drop_field(field_name)
+        except DatabaseError as db_error:
+            logger.error("Database error dropping field '%s': %s", field_name, str(db_error))
+            return Response({"error": str(db_error)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"message": f"Field '{field_name}' deleted successfully", **result}, status=status.HTTP_200_OK)
 
-            if field_name not in columns:
-                return Response({"error": f"Field '{field_name}' not found"}, status=status.HTTP_404_NOT_FOUND)
+    def drop_field(self, field_name, progress=None, online=False):
+        column = schema_registry.get(field_name)
+        if column is not None and column.json_key is not None:
+            result = drop_json_field(field_name)
+        else:
+            result = drop_column(TABLE_NAME, field_name, progress, online=online)
+        schema_changed.send(sender=self.__class__, operation='drop', field_name=field_name)
+        return result
 
-            new_columns = [col for col in columns if col != field_name]
-            cursor.execute(f"CREATE TABLE employees_employee_temp ({', '.join(new_columns)})")
-            cursor.execute(f"INSERT INTO employees_employee_temp ({', '.join(new_columns)}) SELECT {', '.join(new_columns)} FROM employees_employee")
-            cursor.execute("DROP TABLE employees_employee")
-            cursor.execute("ALTER TABLE employees_employee_temp RENAME TO employees_employee")
 
-            return Response({"message": f"Field '{field_name}' deleted successfully"}, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class IndexView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """List the indexes on the employee table."""
+        return Response({"indexes": [describe(index) for index in schema_registry.indexes()]}, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        """Create an index over one or more dynamic fields, optionally as a background schema job."""
+        fields = request.data.get('fields')
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(',') if name.strip()]
+        try:
+            validate_index_fields(fields)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        existing = find_index(fields)
+        if existing is not None:
+            return Response(
+                {"error": f"Index '{existing.name}' already covers these fields"}, status=status.HTTP_409_CONFLICT
+            )
+        taken = index_name(fields)
+        if any(index.name == taken for index in schema_registry.indexes()):
+            return Response(
+                {"error": f"Index name '{taken}' is already used by an index on other fields"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        unique = is_truthy(request.data.get('unique', False))
+
+        if is_truthy(request.data.get('async', request.GET.get('async'))):
+            try:
+                job = schema_jobs.submit(
+                    'index', ','.join(fields), lambda progress: {'index': self.create(fields, unique)}
+                )
+            except JobConflict as running:
+                return Response(
+                    {"error": "Another schema change is in progress", "job_id": str(running)},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return Response(
+                {"job": job.as_dict(), "status_url": reverse('schema-job', args=[job.id])},
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        try:
+            name = self.create(fields, unique)
+        except IntegrityError:
+            return Response({"error": "Fields have duplicate values"}, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as db_error:
+            logger.error("Database error creating index on '%s': %s", ', '.join(fields), str(db_error))
+            return Response({"error": str(db_error)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"message": f"Index '{name}' created successfully", "index": name}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        """Drop an index created through this endpoint, by name or by its fields."""
+        name = request.data.get('name')
+        fields = request.data.get('fields')
+        if not name and fields:
+            if isinstance(fields, str):
+                fields = [field.strip() for field in fields.split(',') if field.strip()]
+            existing = find_index(fields) if isinstance(fields, list) else None
+            name = existing.name if existing is not None else index_name(fields)
+        if not name:
+            return Response({"error": "Index name or fields are required"}, status=status.HTTP_400_BAD_REQUEST)
+        index = next((index for index in schema_registry.indexes() if index.name == name), None)
+        if index is None:
+            return Response({"error": f"Index '{name}' not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not describe(index)['managed']:
+            return Response(
+                {"error": "Only indexes created through this endpoint can be dropped"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            drop_index(name)
+        except DatabaseError as db_error:
+            logger.error("Database error dropping index '%s': %s", name, str(db_error))
+            return Response({"error": str(db_error)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        schema_changed.send(sender=self.__class__, operation='drop_index', field_name=name)
+        return Response({"message": f"Index '{name}' dropped successfully"}, status=status.HTTP_200_OK)
+
+    def create(self, fields, unique):
+        name = create_index(fields, unique)
+        schema_changed.send(sender=self.__class__, operation='add_index', field_name=name)
+        return name
+
+
+class QueryPlanView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Explain the list query for the given parameters and report which filters use an index."""
+        try:
+            page = KeysetPage.from_request(request)
+            fields = requested_fields(request.GET.get('fields'))
+            filters = parse_filters(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        query, params = list_query(request.GET.get('search'), page, fields, filters)
+        return Response(plan_report(query, params, filters), status=status.HTTP_200_OK)
+
+
+def sequence_param(request, name, default=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return value
+
+
+class EmployeeChangesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Rows upserted and ids deleted since ``?since=`` (a sequence number from the previous
+        response's ``next``; 0 to start from scratch), limited to ``?fields=``.
+        """
+        try:
+            since = sequence_param(request, 'since', 0)
+            after = sequence_param(request, 'after')
+            limit = min(sequence_param(request, 'limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError("limit must be positive")
+            fields = requested_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            changes = change_feed.changes(since, limit, fields, after)
+        except ResyncRequired as expired:
+            return Response(
+                {"error": "Changes since this sequence number are no longer available; start again from 0",
+                 "horizon": expired.horizon},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(changes, status=status.HTTP_200_OK)
+
+
+class EmployeeStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Headcount, filled/empty counts per column and value counts per grouped field,
+        read from trigger-maintained summary tables (``?group_by=`` picks grouped fields).
+        """
+        group_by = request.GET.get('group_by')
+        if group_by is not None:
+            group_by = [name.strip() for name in group_by.split(',') if name.strip()]
+
+        # The grouped fields change the document without touching the table or the schema version.
+        summary_tables.ensure()
+        etag = employee_etag(request, summary_tables.grouped)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        try:
+            stats = summary_tables.snapshot(group_by)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return with_etag(Response(stats, status=status.HTTP_200_OK), etag)
+
+
+class StatsGroupView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """List the fields whose values are counted by the stats endpoint."""
+        summary_tables.ensure()
+        return Response({"group_by": summary_tables.grouped_fields()}, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        """Start counting the values of a field; the counts are built from the table once."""
+        field_name = request.data.get('field_name')
+        try:
+            added = summary_tables.add_group(field_name)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as db_error:
+            logger.error("Database error grouping stats by '%s': %s", field_name, str(db_error))
+            return Response({"error": str(db_error)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if not added:
+            return Response({"error": f"Field '{field_name}' is already grouped"}, status=status.HTTP_409_CONFLICT)
+        return Response({"message": f"Counting values of '{field_name}'"}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        """Stop counting the values of a field."""
+        field_name = request.data.get('field_name')
+        if not field_name:
+            return Response({"error": "Field name is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if not summary_tables.remove_group(field_name):
+            return Response({"error": f"Field '{field_name}' is not grouped"}, status=status.HTTP_404_NOT_FOUND)
+        # Rebuild the triggers now: the new schema stamp tells other workers the groups changed.
+        summary_tables.ensure()
+        return Response({"message": f"Stopped counting values of '{field_name}'"}, status=status.HTTP_200_OK)
+
+
+class SchemaJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        """Report the status and progress of a background schema change."""
+        job = schema_jobs.get(job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.as_dict(), status=status.HTTP_200_OK)
 
 
 class EmployeeDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        """Retrieve a single employee by ID."""
-        query = "SELECT * FROM employees_employee WHERE id = %s"
-        employee = Employee.objects.raw(query, [pk])
-        
-        if not employee:
-            return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+        """Retrieve a single employee by ID, limited to ``?fields=`` when given."""
+        try:
+            fields = requested_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        columns = [col[0] for col in connection.cursor().description]
-        data = {columns[i]: getattr(employee[0], columns[i]) for i in range(len(columns))}
-        return Response(data, status=status.HTTP_200_OK)
-    
+        etag = employee_etag(request, pk)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-    
+        with read_connection().cursor() as cursor:
+            cursor.execute(detail_query(fields), [pk])
+            row = cursor.fetchone()
+
+        if row is None:
+            return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Names come from the projection, so they match the schema whatever the cursor reports.
+        data = dict(zip(fields, row))
+        return with_etag(Response(data, status=status.HTTP_200_OK), etag)
 
 
     def put(self, request, pk):
-        """Update employee details with support for file fields using raw SQL only."""
+        """Update employee details and file fields with a single UPDATE."""
         non_file_data = {key: value for key, value in request.POST.items()}
         file_fields = {key: file for key, file in request.FILES.items()}
 
-        # Build SQL for updating non-file data
-        if non_file_data:
-            columns = ', '.join([f"{key} = %s" for key in non_file_data.keys()])
-            values = list(non_file_data.values()) + [pk]
-            query = f"UPDATE employees_employee SET {columns} WHERE id = %s"
+        if non_file_data or file_fields:
+            try:
+                # Checked before any file is written, so a rejected request leaves nothing in MEDIA_ROOT.
+                statement = update_statement(list(non_file_data) + list(file_fields), "id = %s")
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                non_file_data.update(store_uploads(file_fields))
+            except OSError as e:
+                logger.error("Error storing uploaded files for employee '%s': %s", pk, str(e))
+                return Response(
+                    {"error": "Could not store uploaded files"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
 
             try:
-                with connection.cursor() as cursor:
-                    cursor.execute(query, values)
-                    if cursor.rowcount == 0:
-                        return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+                if group_commit.execute(statement.sql, statement.params(non_file_data) + [pk]).rowcount == 0:
+                    return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
             except DatabaseError as db_error:
                 logger.error("Database error updating employee '%s': %s", pk, str(db_error))
                 return Response({"error": "Database error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # Handle file fields
-        if file_fields:
-            for field, file in file_fields.items():
-                # Define file path, assuming a media directory and employee ID folder
-                file_path = f"media/{field}s/{file.name}"
-                with open(file_path, 'wb+') as destination:
-                    for chunk in file.chunks():
-                        destination.write(chunk)
-
-                # Update the file path in the database using raw SQL
-                query = f"UPDATE employees_employee SET {field} = %s WHERE id = %s"
-                try:
-                    with connection.cursor() as cursor:
-                        cursor.execute(query, [f"{field}s/{file.name}", pk])
-                except DatabaseError as db_error:
-                    logger.error("Database error updating file for employee '%s': %s", pk, str(db_error))
-                    return Response({"error": "Database error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+        response_cache.invalidate()
         return Response({"message": "Employee updated successfully"}, status=status.HTTP_200_OK)
 
 
@@ -238,9 +547,170 @@ class EmployeeDetailView(APIView):
         """Delete an employee by ID."""
         query = "DELETE FROM employees_employee WHERE id = %s"
         
-        with connection.cursor() as cursor:
-            cursor.execute(query, [pk])
-            if cursor.rowcount == 0:
-                return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
-        
+        if group_commit.execute(query, [pk]).rowcount == 0:
+            return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        response_cache.invalidate()
         return Response({"message": "Employee deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class EmployeeImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Bulk-create employees from a CSV or NDJSON upload."""
+        upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else request.stream
+        if upload is None:
+            return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        import_format = self.detect_format(request, upload)
+        if import_format not in IMPORT_FORMATS:
+            return Response({"error": "Unsupported import format"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            batch_size = int(request.GET.get('batch_size', DEFAULT_BATCH_SIZE))
+        except ValueError:
+            return Response({"error": "batch_size must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        dry_run = is_truthy(request.GET.get('dry_run'))
+
+        reader = read_csv if import_format == 'csv' else read_ndjson
+        importer = BulkImporter(batch_size=batch_size, dry_run=dry_run)
+        try:
+            report = importer.run(reader(iter_lines(upload)), import_format)
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as db_error:
+            logger.error("Database error importing employees: %s", str(db_error))
+            return Response(
+                {"error": "Database error occurred.", **importer.report()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        if report['inserted'] and not dry_run:
+            response_cache.invalidate()
+        return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+    @staticmethod
+    def detect_format(request, upload):
+        requested = request.GET.get('file_format')
+        if requested:
+            return requested.lower()
+        name = getattr(upload, 'name', '') or ''
+        content_type = getattr(upload, 'content_type', None) or request.content_type
+        if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonlines' in content_type:
+            return 'ndjson'
+        return 'csv'
+
+
+class EmployeeExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Stream the employee table as CSV or NDJSON, optionally limited to some columns."""
+        export_format = request.GET.get('file_format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        requested = [name.strip() for name in request.GET.get('columns', '').split(',') if name.strip()]
+        if requested:
+            unknown = [name for name in requested if schema_registry.get(name) is None]
+            if unknown:
+                return Response({"error": f"Unknown columns: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+            columns = requested
+        else:
+            # File and image fields are left out unless asked for by name.
+            columns = default_fields()
+
+        query = f"SELECT {select_list(columns)} FROM {TABLE_NAME} ORDER BY id"
+        return stream_export(query, [], export_format)
+
+
+class EmployeeBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        """Apply the same changes to every selected employee in one statement."""
+        patch = request.data.get('patch')
+        if not isinstance(patch, dict) or not patch:
+            return Response({"error": "patch must be a non-empty object"}, status=status.HTTP_400_BAD_REQUEST)
+        columns = set(schema_registry.names())
+        unknown = [name for name in patch if name == 'id' or name not in columns]
+        if unknown:
+            return Response(
+                {"error": f"Unknown or read-only columns: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            check_scalars(patch)
+            where, params = selection_clause(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        statement = update_statement(list(patch), ' AND '.join(where))
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(statement.sql, statement.params(patch) + params)
+                updated = cursor.rowcount
+        except IntegrityError as integrity_error:
+            return Response({"error": str(integrity_error)}, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as db_error:
+            logger.error("Database error in bulk update: %s", str(db_error))
+            return Response({"error": "Database error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response_cache.invalidate()
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Delete every selected employee in one statement."""
+        try:
+            where, params = selection_clause(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM employees_employee WHERE {' AND '.join(where)}", params)
+                deleted = cursor.rowcount
+        except DatabaseError as db_error:
+            logger.error("Database error in bulk delete: %s", str(db_error))
+            return Response({"error": "Database error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response_cache.invalidate()
+        return Response({"deleted": deleted}, status=status.HTTP_200_OK)
+
+
+class ResponseCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Hit/miss counters of the list/search response cache in this process."""
+        return Response(response_cache.stats(), status=status.HTTP_200_OK)
+
+
+class StatementCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Hit/miss counters of the compiled INSERT/UPDATE/SELECT template cache in this process."""
+        return Response(statement_cache.stats(), status=status.HTTP_200_OK)
+
+
+class GroupCommitStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Batch and write counters of the group commit writer in this process."""
+        return Response(group_commit.stats(), status=status.HTTP_200_OK)
+
+
+class RequestStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Per-endpoint request duration histograms, DB time and query counts in this process."""
+        return Response(endpoint_stats.snapshot(), status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Start the histograms over."""
+        endpoint_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
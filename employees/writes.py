@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+DEFAULTS = {
+    # Off by default: with one writer per request, each write commits on its own.
+    'ENABLED': False,
+    # Most writes one transaction may carry.
+    'MAX_BATCH': 64,
+    # How long the writer waits for more writes after the first one of a batch
+    # arrives. Writes that queue while a batch commits are picked up without waiting.
+    'MAX_DELAY_MS': 2,
+}
+
+WriteResult = namedtuple('WriteResult', ['rowcount', 'lastrowid'])
+
+_STOP = object()
+
+
+class GroupCommit:
+    """
+    Single writer thread that commits concurrent write statements in groups.
+
+    SQLite lets one connection write at a time, so request threads that
+    each commit their own statement queue on the lock and pay for one
+    commit each. Here callers hand their statement to a queue and wait;
+    the writer drains it, runs up to MAX_BATCH statements in one
+    transaction and commits once. Each statement runs in its own savepoint,
+    so a failing one is rolled back alone and its caller gets the error
+    while the others commit. Results are handed back only after the commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self.batches = 0
+        self.writes = 0
+
+    @property
+    def options(self):
+        return {**DEFAULTS, **getattr(settings, 'EMPLOYEES_GROUP_COMMIT', {})}
+
+    @property
+    def enabled(self):
+        return self.options['ENABLED']
+
+    def execute(self, sql, params=()):
+        """Run one write statement and return its WriteResult; raises the statement's own error."""
+        # Inside a transaction the statement has to see (and be undone with) the caller's other changes.
+        if not self.enabled or connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return WriteResult(cursor.rowcount, cursor.lastrowid)
+        future = Future()
+        self._start()
+        self._queue.put((sql, params, future))
+        return future.result()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='employees-group-commit', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._collect()
+                if batch is None:
+                    return
+                if batch:
+                    self._commit(batch)
+        finally:
+            connections.close_all()
+
+    def _collect(self):
+        """The next batch, or None when the writer should stop."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        options = self.options
+        batch = [first]
+        deadline = time.monotonic() + options['MAX_DELAY_MS'] / 1000
+        while len(batch) < options['MAX_BATCH']:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish this batch; the next _collect sees the stop again.
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql, params, future in batch:
+                    try:
+                        with transaction.atomic():
+                            cursor.execute(sql, params)
+                        outcomes.append((future, WriteResult(cursor.rowcount, cursor.lastrowid), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+        except Exception as error:
+            # The commit itself failed: nothing in the batch was written.
+            connection.close_if_unusable_or_obsolete()
+            for _sql, _params, future in batch:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'batches': self.batches,
+            'writes': self.writes,
+            'mean_batch_size': round(self.writes / self.batches, 2) if self.batches else None,
+        }
+
+    def shutdown(self):
+        """Stop the writer once the queued writes are committed."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        self.batches = self.writes = 0
+
+
+group_commit = GroupCommit()